@@ -0,0 +1,222 @@
+import gzip
+import json
+import os
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+shardIndexDtype = np.dtype(
+    [
+        ("absIndex", np.uint64),
+        ("worker", np.uint16),
+        ("shard", np.uint32),
+        ("blockOffset", np.uint64),
+        ("blockLength", np.uint32),
+        ("offset", np.uint32),
+        ("length", np.uint32),
+    ]
+)
+"""
+Sidecar index record of one frame: the frame's line is bytes [offset, offset + length) of the decompressed block
+stored at [blockOffset, blockOffset + blockLength) of shard file (worker, shard)
+"""
+
+shardExtensions: Dict[Optional[str], str] = {None: ".jsonl", "gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+
+def _zstandard() -> Any:
+    try:  # Optional dependency, only needed for zstd shards
+        return import_module("zstandard")
+    except ImportError as e:
+        raise ImportError("zstd compressed shards need zstandard, pip install zstandard") from e
+
+
+def compressBlock(data: bytes, compression: Optional[str]) -> bytes:
+    """Every block is a complete gzip member / zstd frame, so a shard is still one valid .gz/.zst stream"""
+    if compression is None:
+        return data
+    if compression == "gzip":
+        return gzip.compress(data, mtime=0)
+    if compression == "zstd":
+        return _zstandard().ZstdCompressor().compress(data)
+    raise ValueError(f"Unknown compression: {compression}, valid options are: {list(shardExtensions)}")
+
+
+def decompressBlock(data: bytes, compression: Optional[str]) -> bytes:
+    if compression is None:
+        return data
+    if compression == "gzip":
+        return gzip.decompress(data)
+    if compression == "zstd":
+        return _zstandard().ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown compression: {compression}, valid options are: {list(shardExtensions)}")
+
+
+def shardFileName(worker: int, shard: int, compression: Optional[str]) -> str:
+    return f"part-{worker:03d}-{shard:05d}{shardExtensions[compression]}"
+
+
+def indexFileName(worker: int) -> str:
+    return f"index-{worker:03d}.bin"
+
+
+class FrameShardWriter:
+    """
+    Append JSON lines of frames to size bounded shard files, with a sidecar index (index-<worker>.bin) for random access
+    Lines are compressed in blocks of framesPerBlock frames, the index records of a block are appended to the
+    sidecar once the block is on disk, so an interrupted export leaves an index that only points to complete blocks
+    """
+
+    bytesPerShard: int = 256 << 20
+    """A new shard is started once the current one is larger than this (compressed size)"""
+    framesPerBlock: int = 64
+    """Frames compressed together, more compress better, fewer make a random read decompress less"""
+
+    def __init__(self, dir: Path, worker: int = 0, compression: Optional[str] = None):
+        if compression not in shardExtensions:
+            raise ValueError(f"Unknown compression: {compression}, valid options are: {list(shardExtensions)}")
+        if compression == "zstd":
+            _zstandard()  # Fail now, not when the first block is written
+        self.dir = Path(dir)
+        self.worker = worker
+        self.compression = compression
+        self._file = None
+        self._shard = -1
+        self._shardBytes = 0
+        self._lines: List[bytes] = []
+        self._absIndexes: List[int] = []
+        os.makedirs(self.dir, exist_ok=True)
+        # A previous export into the same directory: its index would point into the shards rewritten below
+        for path in self.dir.glob(f"part-{worker:03d}-*"):
+            path.unlink()
+        (self.dir / indexFileName(worker)).unlink(missing_ok=True)
+
+    def write(self, absIndex: int, line: bytes) -> None:
+        """line: one JSON document, without the trailing newline"""
+        self._lines.append(line + b"\n")
+        self._absIndexes.append(absIndex)
+        if len(self._lines) >= self.framesPerBlock:
+            self.flushBlock()
+
+    def flushBlock(self) -> None:
+        if not self._lines:
+            return
+        if self._file is None or self._shardBytes >= self.bytesPerShard:
+            self.closeShard()
+            self._shard += 1
+            self._file = open(self.dir / shardFileName(self.worker, self._shard, self.compression), "wb")
+            self._shardBytes = 0
+
+        block = compressBlock(b"".join(self._lines), self.compression)
+        lengths = np.array([len(line) for line in self._lines], dtype=np.uint32)
+        records = np.empty(len(self._lines), dtype=shardIndexDtype)
+        records["absIndex"] = self._absIndexes
+        records["worker"] = self.worker
+        records["shard"] = self._shard
+        records["blockOffset"] = self._shardBytes
+        records["blockLength"] = len(block)
+        records["offset"] = np.cumsum(lengths) - lengths
+        records["length"] = lengths
+
+        self._file.write(block)
+        self._file.flush()
+        with open(self.dir / indexFileName(self.worker), "ab") as indexFile:  # After the block, see class docstring
+            indexFile.write(records.tobytes())
+        self._shardBytes += len(block)
+        self._lines = []
+        self._absIndexes = []
+
+    def closeShard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self) -> None:
+        self.flushBlock()
+        self.closeShard()
+
+
+class FrameShardReader:
+    """
+    Random access to the frames written by FrameShardWriter (JsonLinesSink), by absIndex, without listing the shards
+    The index files of all workers are read once and sorted by absIndex (of duplicates the last record written wins),
+    the last decompressed block is kept,
+    so iterating in absIndex order decompresses every block about once
+    """
+
+    def __init__(self, dir: Path):
+        self.dir = Path(dir)
+        parts = [
+            np.fromfile(path, dtype=shardIndexDtype, count=path.stat().st_size // shardIndexDtype.itemsize)
+            for path in sorted(self.dir.glob("index-*.bin"))
+        ]
+        records = np.concatenate(parts) if parts else np.empty(0, dtype=shardIndexDtype)
+        records = records[np.argsort(records["absIndex"], kind="stable")]
+        # If an absIndex was written more than once, keep the newest (last) record
+        isLast = np.ones(len(records), dtype=bool)
+        isLast[:-1] = records["absIndex"][1:] != records["absIndex"][:-1]
+        self.index: NDArray = records[isLast]
+        self.compression = self._detectCompression()
+        self._block: Tuple[Optional[Tuple[int, int, int]], bytes] = (None, b"")
+
+    def _detectCompression(self) -> Optional[str]:
+        if len(self.index) == 0:
+            return None
+        worker, shard = int(self.index[0]["worker"]), int(self.index[0]["shard"])
+        for compression in shardExtensions:
+            if (self.dir / shardFileName(worker, shard, compression)).exists():
+                return compression
+        raise OSError(f"Shard of worker {worker} number {shard} not found in {self.dir}")
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, absIndex: int) -> bool:
+        position = np.searchsorted(self.index["absIndex"], absIndex)
+        return bool(position < len(self.index) and self.index[position]["absIndex"] == absIndex)
+
+    @property
+    def absIndexes(self) -> NDArray:
+        return self.index["absIndex"]
+
+    def record(self, absIndex: int) -> np.void:
+        position = np.searchsorted(self.index["absIndex"], absIndex)
+        if position >= len(self.index) or self.index[position]["absIndex"] != absIndex:
+            raise KeyError(f"Frame {absIndex} is not in {self.dir}")
+        return self.index[position]
+
+    def _readLine(self, record: np.void) -> bytes:
+        worker, shard, blockOffset, blockLength = (
+            int(record["worker"]),
+            int(record["shard"]),
+            int(record["blockOffset"]),
+            int(record["blockLength"]),
+        )
+        offset, length = int(record["offset"]), int(record["length"])
+        path = self.dir / shardFileName(worker, shard, self.compression)
+        if self.compression is None:  # No need to read the whole block
+            with open(path, "rb") as shardFile:
+                shardFile.seek(blockOffset + offset)
+                return shardFile.read(length)
+        key = (worker, shard, blockOffset)
+        if self._block[0] != key:
+            with open(path, "rb") as shardFile:
+                shardFile.seek(blockOffset)
+                self._block = (key, decompressBlock(shardFile.read(blockLength), self.compression))
+        return self._block[1][offset : offset + length]
+
+    def readBytes(self, absIndex: int) -> bytes:
+        """JSON line of a frame, with the trailing newline"""
+        return self._readLine(self.record(absIndex))
+
+    def read(self, absIndex: int) -> Dict[str, Any]:
+        """Frame dict of a frame ({"Info": ..., "ReprsDict": ...})"""
+        return json.loads(self.readBytes(absIndex))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """All frames in absIndex order"""
+        for record in self.index:
+            yield json.loads(self._readLine(record))
@@ -0,0 +1,82 @@
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from LogInterface import DataClass, FrameAccessor
+
+
+class ExportRecord:
+    """
+    One frame travelling through the stages of a Pipeline
+    Stages fill it step by step: info (frame information), reprs (ClassName: representation objects of every message
+    of that class, in frame order), image (RGB array)
+    """
+
+    def __init__(self, frame: FrameAccessor):
+        self.frame = frame
+        self.info: Dict[str, Any] = {}
+        self.reprs: Dict[str, List[DataClass]] = {}
+        self.image: Optional[np.ndarray] = None
+        self.extra: Dict[str, Any] = {}
+        """Free form fields for user Transform stages, sinks write them next to info"""
+
+    @property
+    def key(self) -> str:
+        """Unique name of the record inside one log, also the file name stem used by file based sinks"""
+        return Path(self.frame.jsonName).stem
+
+
+class Stage:
+    """
+    A step of a Pipeline, process() gets every record in frame order and returns it (maybe modified)
+    or None to drop the frame, open() and close() are called once per worker process
+    """
+
+    def open(self, outputDir: Path, workerId: int) -> None:
+        pass
+
+    def process(self, record: ExportRecord) -> Optional[ExportRecord]:
+        return record
+
+    def close(self) -> None:
+        pass
+
+
+class Pipeline:
+    """
+    A run composed of stages, usually select frames -> decode representations -> transform -> sinks
+    Every worker process opens the pipeline once and feeds it all the frames of its batches,
+    sinks write their own part files per worker, so workers never share an output file
+    """
+
+    def __init__(self, stages: Iterable[Stage]):
+        self.stages: List[Stage] = list(stages)
+
+    def open(self, outputDir: Path, workerId: int = 0) -> "Pipeline":
+        for stage in self.stages:
+            stage.open(Path(outputDir), workerId)
+        return self
+
+    def run(self, frames: FrameAccessor) -> int:
+        """Push every frame of frames through the stages, returns the number of frames not dropped by a stage"""
+        numKept = 0
+        for frame in frames:
+            record: Optional[ExportRecord] = ExportRecord(frame.copy().freeze())
+            for stage in self.stages:
+                record = stage.process(record)  # type: ignore record is not None here
+                if record is None:
+                    break
+            else:
+                numKept += 1
+        return numKept
+
+    def close(self) -> None:
+        for stage in self.stages:
+            stage.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,357 @@
+import io
+import os
+import tarfile
+from abc import ABC, abstractmethod
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+from PIL.Image import fromarray
+
+from ImageUtils import ImageWriter
+from Utils import dumpJsonBytes, flattenDataClass
+
+from .FrameShards import FrameShardWriter, shardExtensions
+from .Pipeline import ExportRecord, Pipeline, Stage
+from .Stages import DecodeImage, DecodeReprs
+
+
+def recordAsDict(record: ExportRecord) -> Dict[str, Any]:
+    """
+    Same layout as Frame.asDict(), with the fields of Transform stages added to Info
+    Like Frame.reprsDict, a class logged several times in the frame keeps only its last message, ColumnarSink has all
+    """
+    return {
+        "Info": {**record.info, **record.extra},
+        "ReprsDict": {className: objs[-1].asDict() for className, objs in record.reprs.items() if objs},
+    }
+
+
+class Sink(Stage, ABC):
+    """
+    A stage that writes records, output goes to outputDir/name, every worker writes its own files
+    Sinks pass records on, so several sinks can follow each other in one pipeline
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.dir: Path
+        self.workerId = 0
+
+    def open(self, outputDir: Path, workerId: int) -> None:
+        self.dir = Path(outputDir) / self.name
+        self.workerId = workerId
+        os.makedirs(self.dir, exist_ok=True)
+
+    def process(self, record: ExportRecord) -> Optional[ExportRecord]:
+        self.write(record)
+        return record
+
+    @abstractmethod
+    def write(self, record: ExportRecord) -> None:
+        pass
+
+
+class LegacySink(Sink):
+    """
+    The CLI's original output, one JSON file per frame (Frame.saveFrameDict) and one PNG per image
+    Images are written by an ImageWriter, so they are encoded in threads while the next frames are parsed
+    extractOptions: arguments of Image.extract() to save downscaled / grayscale / cropped images
+    writerOptions: arguments of ImageWriter (format, sidecar, compressLevel, ...), None for PNGs with tEXt metadata
+    """
+
+    def __init__(
+        self,
+        extractOptions: Optional[Dict[str, Any]] = None,
+        writerOptions: Optional[Dict[str, Any]] = None,
+    ):
+        super().__init__("")
+        self.extractOptions = extractOptions
+        self.writerOptions = writerOptions
+        self._writer: Optional[ImageWriter] = None
+
+    def open(self, outputDir: Path, workerId: int) -> None:
+        self.workerId = workerId
+        self._writer = ImageWriter(
+            **(self.writerOptions or {}),
+            extractOptions=self.extractOptions,
+            workerId=workerId,
+            slientFail=True,
+        )
+
+    def write(self, record: ExportRecord) -> None:
+        record.frame.saveFrameDict()
+        record.frame.saveImageWithMetaData(slientFail=True, writer=self._writer)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class JsonLinesSink(Sink):
+    """
+    One JSON line per frame (Frame.asDict() layout) in size bounded, optionally gzip/zstd compressed shards,
+    with a sidecar index for random access by absIndex, see FrameShardWriter and FrameShardReader
+    """
+
+    def __init__(self, name: Optional[str] = None, compression: Optional[str] = None):
+        """name: None to name the output directory after the format (jsonl, jsonl.gz, jsonl.zst)"""
+        super().__init__(name if name is not None else shardExtensions[compression].lstrip("."))
+        self.compression = compression
+        self._writer: Optional[FrameShardWriter] = None
+
+    def open(self, outputDir: Path, workerId: int) -> None:
+        super().open(outputDir, workerId)
+        self._writer = FrameShardWriter(self.dir, workerId, self.compression)
+
+    def write(self, record: ExportRecord) -> None:
+        self._writer.write(record.frame.absIndex, dumpJsonBytes(recordAsDict(record)))  # type: ignore opened
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class ImageDirSink(Sink):
+    """Write record.image (see DecodeImage) of every frame into one directory, named like Frame.imageName"""
+
+    def __init__(self, name: str = "images", format: str = "png"):
+        super().__init__(name)
+        self.format = format
+
+    def write(self, record: ExportRecord) -> None:
+        if record.image is None:
+            return
+        fileName = Path(record.frame.imageName).with_suffix(f".{self.format}").name
+        fromarray(record.image).save(self.dir / fileName)
+
+
+class TarShardSink(Sink):
+    """
+    WebDataset style tar shards, every frame is <key>.json (Frame.asDict() layout) and <key>.png if it has an image
+    A shard is closed once it holds framesPerShard frames or bytesPerShard bytes
+    """
+
+    framesPerShard: int = 10000
+    bytesPerShard: int = 1 << 30
+
+    def __init__(self, name: str = "shards", imageFormat: str = "png"):
+        super().__init__(name)
+        self.imageFormat = imageFormat
+        self._tar: Optional[tarfile.TarFile] = None
+        self._numFrames = 0
+        self._numBytes = 0
+        self._shard = 0
+
+    def _addMember(self, name: str, data: bytes):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        self._tar.addfile(info, io.BytesIO(data))  # type: ignore opened in write()
+        self._numBytes += len(data)
+
+    def write(self, record: ExportRecord) -> None:
+        if (
+            self._tar is None
+            or self._numFrames >= self.framesPerShard
+            or self._numBytes >= self.bytesPerShard
+        ):
+            self.close()
+            self._tar = tarfile.open(self.dir / f"shard-{self.workerId:03d}-{self._shard:05d}.tar", "w")
+            self._shard += 1
+            self._numFrames = 0
+            self._numBytes = 0
+        self._addMember(f"{record.key}.json", dumpJsonBytes(recordAsDict(record)))
+        if record.image is not None:
+            buffer = io.BytesIO()
+            fromarray(record.image).save(buffer, format=self.imageFormat)
+            self._addMember(f"{record.key}.{self.imageFormat}", buffer.getvalue())
+        self._numFrames += 1
+
+    def close(self) -> None:
+        if self._tar is not None:
+            self._tar.close()
+            self._tar = None
+
+
+class ColumnBuffer:
+    """Rows of one table collected column by column, a column missing in a row gets None"""
+
+    def __init__(self):
+        self.columns: Dict[str, List[Any]] = {}
+        self.numRows = 0
+
+    def append(self, row: Dict[str, Any]) -> None:
+        for key, value in row.items():
+            column = self.columns.get(key)
+            if column is None:
+                column = self.columns[key] = [None] * self.numRows
+            column.append(value)
+        self.numRows += 1
+        for column in self.columns.values():
+            if len(column) < self.numRows:
+                column.append(None)
+
+
+class ColumnarSink(Sink):
+    """
+    Tables for columnar file formats: a "Frame" table with the frame information and one table per representation,
+    one row per message (with absFrameIndex, timestamp and threadName to join on) and one column per flattened field
+    Every table is written to a new part file every rowsPerFile rows, so memory stays bounded
+    """
+
+    rowsPerFile: int = 100000
+    extension: str = ""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._tables: Dict[str, ColumnBuffer] = {}
+        self._parts: Dict[str, int] = {}
+
+    def _append(self, tableName: str, row: Dict[str, Any]) -> None:
+        table = self._tables.setdefault(tableName, ColumnBuffer())
+        table.append(row)
+        if table.numRows >= self.rowsPerFile:
+            self._flush(tableName)
+
+    def write(self, record: ExportRecord) -> None:
+        info = {**record.info, **record.extra}
+        frameRow = {
+            key: ",".join(map(str, value)) if isinstance(value, list) else value
+            for key, value in info.items()
+        }
+        frameRow["absFrameIndex"] = record.frame.absIndex
+        self._append("Frame", frameRow)
+        keys = {
+            "absFrameIndex": record.frame.absIndex,
+            "timestamp": info.get("timestamp"),
+            "threadName": info.get("threadName"),
+        }
+        for className, objs in record.reprs.items():
+            for obj in objs:
+                self._append(className, {**keys, **flattenDataClass(obj)})
+
+    def _flush(self, tableName: str) -> None:
+        table = self._tables.pop(tableName, None)
+        if table is None or table.numRows == 0:
+            return
+        part = self._parts.get(tableName, 0)
+        self._parts[tableName] = part + 1
+        os.makedirs(self.dir / tableName, exist_ok=True)
+        self.writeTable(
+            self.dir / tableName / f"part-{self.workerId:03d}-{part:05d}.{self.extension}",
+            table.columns,
+        )
+
+    @abstractmethod
+    def writeTable(self, path: Path, columns: Dict[str, List[Any]]) -> None:
+        pass
+
+    def close(self) -> None:
+        for tableName in list(self._tables):
+            self._flush(tableName)
+
+
+class NpzSink(ColumnarSink):
+    """Tables as .npz, one array per column, missing numbers become NaN, columns that are not numeric become strings"""
+
+    extension = "npz"
+
+    def __init__(self, name: str = "npz"):
+        super().__init__(name)
+
+    @staticmethod
+    def toArray(values: List[Any]) -> np.ndarray:
+        if any(value is None for value in values):
+            try:
+                return np.asarray([np.nan if value is None else value for value in values], dtype=np.float64)
+            except (TypeError, ValueError):
+                return np.asarray(["" if value is None else str(value) for value in values])
+        array = np.asarray(values)
+        if array.dtype == object:
+            return array.astype(str)
+        return array
+
+    def writeTable(self, path: Path, columns: Dict[str, List[Any]]) -> None:
+        np.savez(path, **{key: self.toArray(values) for key, values in columns.items()})
+
+
+class ArrowSink(ColumnarSink):
+    """Tables as Arrow IPC files (fileFormat "arrow") or Parquet files (fileFormat "parquet"), needs pyarrow"""
+
+    def __init__(self, name: Optional[str] = None, fileFormat: str = "parquet"):
+        if fileFormat not in ["parquet", "arrow"]:
+            raise ValueError(f"Unknown file format: {fileFormat}")
+        super().__init__(name if name is not None else fileFormat)
+        self.fileFormat = fileFormat
+        self.extension = fileFormat
+        self._pyarrow: Any = None
+
+    def open(self, outputDir: Path, workerId: int) -> None:
+        try:  # Optional dependency, only needed by this sink
+            self._pyarrow = import_module("pyarrow")
+        except ImportError as e:
+            raise ImportError(f"{self.fileFormat} export needs pyarrow, pip install pyarrow") from e
+        super().open(outputDir, workerId)
+
+    def toArray(self, values: List[Any]):
+        pa = self._pyarrow
+        try:
+            return pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):  # Mixed types, keep them as strings
+            return pa.array([None if value is None else str(value) for value in values])
+
+    def writeTable(self, path: Path, columns: Dict[str, List[Any]]) -> None:
+        pa = self._pyarrow
+        table = pa.table({key: self.toArray(values) for key, values in columns.items()})
+        if self.fileFormat == "parquet":
+            import_module("pyarrow.parquet").write_table(table, path)
+        else:
+            with pa.OSFile(str(path), "wb") as file, pa.ipc.new_file(file, table.schema) as writer:
+                writer.write_table(table)
+
+
+exportFormats: Dict[str, Callable[[], Sink]] = {
+    "legacy": LegacySink,
+    "jsonl": JsonLinesSink,
+    "jsonl.gz": lambda: JsonLinesSink(compression="gzip"),
+    "jsonl.zst": lambda: JsonLinesSink(compression="zstd"),
+    "npz": NpzSink,
+    "parquet": lambda: ArrowSink(fileFormat="parquet"),
+    "arrow": lambda: ArrowSink(fileFormat="arrow"),
+    "images": ImageDirSink,
+    "tar": TarShardSink,
+}
+"""Sink of every format name accepted by buildPipeline()"""
+
+
+def buildPipeline(
+    formats: Iterable[str],
+    classNames: Optional[Iterable[str]] = None,
+    stages: Iterable[Stage] = (),
+    extractOptions: Optional[Dict[str, Any]] = None,
+    writerOptions: Optional[Dict[str, Any]] = None,
+) -> Pipeline:
+    """
+    Pipeline that decodes what the formats need once and writes all of them in the same pass
+    classNames: representations to export, None for all; stages: extra stages (selection, Transform) before decoding
+    extractOptions: arguments of Image.extract() (scale, grayscale, crop) for the exported images, None for full images
+    writerOptions: arguments of ImageWriter for the images of the legacy format (format, sidecar, compressLevel, ...)
+    """
+    sinks = []
+    for format in formats:
+        if format not in exportFormats:
+            raise ValueError(f"Unknown export format: {format}, valid options are: {list(exportFormats)}")
+        sink = exportFormats[format]()
+        if isinstance(sink, LegacySink):
+            sink.extractOptions = extractOptions
+            sink.writerOptions = writerOptions
+        sinks.append(sink)
+    decoders: List[Stage] = []
+    if any(not isinstance(sink, (LegacySink, ImageDirSink)) for sink in sinks):
+        decoders.append(DecodeReprs(classNames))
+    if any(isinstance(sink, (ImageDirSink, TarShardSink)) for sink in sinks):
+        decoders.append(DecodeImage(extractOptions=extractOptions))
+    return Pipeline([*stages, *decoders, *sinks])
@@ -0,0 +1,80 @@
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .Pipeline import ExportRecord, Stage
+
+
+class SelectFrames(Stage):
+    """Drop frames that are not from one of threads, or do not contain all of requiredClasses"""
+
+    def __init__(
+        self,
+        threads: Optional[Iterable[str]] = None,
+        requiredClasses: Optional[Iterable[str]] = None,
+        requireImage: bool = False,
+    ):
+        self.threads = set(threads) if threads is not None else None
+        self.requiredClasses = list(requiredClasses or [])
+        self.requireImage = requireImage
+
+    def process(self, record: ExportRecord) -> Optional[ExportRecord]:
+        frame = record.frame
+        if self.threads is not None and frame.threadName not in self.threads:
+            return None
+        if any(className not in frame for className in self.requiredClasses):
+            return None
+        if self.requireImage and not frame.hasImage:
+            return None
+        return record
+
+
+class DecodeReprs(Stage):
+    """
+    Parse the representations of a frame into record.reprs and fill record.info
+    A frame can log a class several times (e.g. Annotation), record.reprs keeps all of them in frame order
+    classNames: only these representations, None for all of them
+    Images are left to DecodeImage, their pixels do not belong in a table or a JSON line
+    """
+
+    def __init__(self, classNames: Optional[Iterable[str]] = None):
+        self.classNames = set(classNames) if classNames is not None else None
+
+    def process(self, record: ExportRecord) -> Optional[ExportRecord]:
+        record.info = record.frame.infoDict
+        for message in record.frame.messages:
+            if message.isImage:
+                continue
+            if self.classNames is not None and message.className not in self.classNames:
+                continue
+            record.reprs.setdefault(message.className, []).append(message.reprObj)
+        return record
+
+
+class DecodeImage(Stage):
+    """
+    Decode the image of a frame into record.image (RGB, HxWx3 uint8), frames without an image are kept as they are
+    extractOptions: arguments of Image.extract() (scale, grayscale, crop) for thumbnails, Y channel only or crops
+    """
+
+    def __init__(self, dropFramesWithoutImage: bool = False, extractOptions: Optional[Dict[str, Any]] = None):
+        self.dropFramesWithoutImage = dropFramesWithoutImage
+        self.extractOptions = extractOptions
+
+    def process(self, record: ExportRecord) -> Optional[ExportRecord]:
+        imageMessage = record.frame.imageMessage
+        if imageMessage is None:
+            return None if self.dropFramesWithoutImage else record
+        if self.extractOptions:
+            record.image = imageMessage.reprObj.extract(**self.extractOptions)
+        else:
+            record.image = imageMessage.reprObj.rgbImage
+        return record
+
+
+class Transform(Stage):
+    """Apply a user function to every record, it returns the (modified) record or None to drop the frame"""
+
+    def __init__(self, function: Callable[[ExportRecord], Optional[ExportRecord]]):
+        self.function = function
+
+    def process(self, record: ExportRecord) -> Optional[ExportRecord]:
+        return self.function(record)
@@ -0,0 +1,6 @@
+from .FrameShards import FrameShardReader, FrameShardWriter
+from .Pipeline import ExportRecord, Pipeline, Stage
+from .Sinks import (ArrowSink, ColumnarSink, ImageDirSink, JsonLinesSink,
+                    LegacySink, NpzSink, Sink, TarShardSink, buildPipeline,
+                    exportFormats)
+from .Stages import DecodeImage, DecodeReprs, SelectFrames, Transform
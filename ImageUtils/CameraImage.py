@@ -1,3 +1,5 @@
+from typing import Any, Dict, Optional, Tuple
+
 import cv2
 from PIL.Image import Image, fromarray
 
@@ -6,6 +8,7 @@ from Primitive import *
 from StreamUtils import StreamUtil
 
 from .Image import Image as ImageBase
+from .ImagePayload import ImagePayload
 from .PixelTypes import YUVPixel, YUYVPixel
 
 
@@ -37,21 +40,18 @@ class CameraImage(ImageBase, DataClass):
         result = self.image[y][x : x + 2]
         return YUYVPixel(bytes(result.flatten()))
 
+    # Single pixels, straight from the array; getYUVs/getRGBs/toRGB of Image for many pixels
     def getY(self, x, y):
-        return self.getPixel(x, y).y(x)
+        return int(self.image[y, x, 0])
 
     def getU(self, x, y):
-        return self.getPixel(x, y).u
+        return int(self.image[y, x - x % 2, 1])
 
     def getV(self, x, y):
-        return self.getPixel(x, y).v
+        return int(self.image[y, x - x % 2 + 1, 1])
 
     def getYUV(self, x, y) -> YUVPixel:
-        yuyv = self.getPixel(x, y)
-        return YUVPixel((0, yuyv.u, yuyv.y(x), yuyv.v))
-
-    def getGrayscaled(self):
-        raise NotImplementedError("getGrayscale not implemented")
+        return YUVPixel((0, self.getU(x, y), self.getY(x, y), self.getV(x, y)))
 
     @classmethod
     def read(cls, sutil: StreamUtil, end) -> "CameraImage":
@@ -67,15 +67,22 @@ class CameraImage(ImageBase, DataClass):
         cameraImage.setResolution(width, height)
         cameraImage.timestamp = int(timestamp)
 
-        cameraImage.image = np.frombuffer(
-            sutil.read(width * height * YUYVPixel.size), dtype=np.uint8
-        ).reshape((height, width * 2, 2))
+        cameraImage.payload = ImagePayload.fromStream(sutil, width * height * YUYVPixel.size)
 
         if sutil.tell() != end:
             raise ValueError("Buffer Size not used up")
 
         return cameraImage
 
+    def decodePayload(self, data: bytes) -> np.ndarray:
+        return np.frombuffer(data, dtype=np.uint8).reshape((self.height, self.width * 2, 2))
+
+    def reducedYUYV(self, scale: int) -> Tuple[np.ndarray, int]:
+        if self.isDecoded or self.payload is None:
+            return self.image, 1
+        # Index straight into the log bytes, only the extracted pixels are copied
+        return np.frombuffer(self.payload.view(), dtype=np.uint8).reshape((self.height, self.width * 2, 2)), 1
+
     @classmethod
     def distributeReadResult(cls, result) -> "CameraImage":
         instance = cls()
@@ -109,9 +116,10 @@ class CameraImage(ImageBase, DataClass):
         else:
             raise ValueError("self.image is not an valid image")
 
-    def saveImage(self, path, metadata=None, slientFail=False):
+    def saveImage(self, path, metadata=None, slientFail=False, extractOptions: Optional[Dict[str, Any]] = None):
+        """extractOptions: arguments of extract() to save a downscaled / grayscale / cropped image"""
         try:
-            img = fromarray(self.rgbImage)
+            img = fromarray(self.extract(**extractOptions) if extractOptions else self.rgbImage)
             img.save(
                 path,
                 pnginfo=metadata,
@@ -0,0 +1,64 @@
+"""
+Array versions of the pixel conversions of PixelTypes, for whole images or lists of pixels
+They use the same scaled integer BT 601 coefficients, so every pixel is bit-for-bit the result of the scalar method
+(YUVPixel.fromYUVToRGB, YUYVPixel.greyscale)
+
+Images are YUYV arrays as CameraImage.image / JPEGImage.image: shape (height, width * 2, 2), [y, x, 0] is the Y of
+pixel x, [y, x, 1] is U for even x and V for odd x (the U and V of a pixel are those of its pair)
+"""
+
+from typing import Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from .PixelTypes import (
+    scaledGCoeffU,
+    scaledGCoeffV,
+    scaledInvUCoeff,
+    scaledInvVCoeff,
+    scaleExponent,
+)
+
+
+def yuyvPlanes(image: NDArray[np.uint8]) -> Tuple[NDArray[np.uint8], NDArray[np.uint8], NDArray[np.uint8]]:
+    """Y, U and V planes (height, width * 2) of a YUYV image, every pixel gets the U and V of its pair"""
+    y = image[:, :, 0]
+    u = np.repeat(image[:, 0::2, 1], 2, axis=1)
+    v = np.repeat(image[:, 1::2, 1], 2, axis=1)
+    return y, u, v
+
+
+def yuyvPixels(image: NDArray[np.uint8], xs: ArrayLike, ys: ArrayLike) -> NDArray[np.uint8]:
+    """(Y, U, V) of the pixels (xs[i], ys[i]), shape (N, 3), as CameraImage.getY/getU/getV"""
+    xs = np.asarray(xs, dtype=np.intp)
+    ys = np.asarray(ys, dtype=np.intp)
+    pairs = xs & ~1
+    result = np.empty(xs.shape + (3,), dtype=np.uint8)
+    result[..., 0] = image[ys, xs, 0]
+    result[..., 1] = image[ys, pairs, 1]
+    result[..., 2] = image[ys, pairs + 1, 1]
+    return result
+
+
+def fromYUVToRGB(Y: ArrayLike, U: ArrayLike, V: ArrayLike) -> NDArray[np.uint8]:
+    """Array version of YUVPixel.fromYUVToRGB, returns (..., 3) R, G, B"""
+    Y = np.asarray(Y, dtype=np.int64)
+    u = np.asarray(U, dtype=np.int64) - 128
+    v = np.asarray(V, dtype=np.int64) - 128
+    result = np.empty(np.broadcast_shapes(Y.shape, u.shape, v.shape) + (3,), dtype=np.uint8)
+    # >> on signed integers floors like Python's, the same as the scalar version
+    result[..., 0] = np.clip(Y + ((v * scaledInvVCoeff) >> scaleExponent), 0, 255)
+    result[..., 1] = np.clip(Y - ((u * scaledGCoeffU + v * scaledGCoeffV) >> scaleExponent), 0, 255)
+    result[..., 2] = np.clip(Y + ((u * scaledInvUCoeff) >> scaleExponent), 0, 255)
+    return result
+
+
+def yuyvToRGB(image: NDArray[np.uint8]) -> NDArray[np.uint8]:
+    """Whole YUYV image to RGB (height, width * 2, 3) with the coefficients of YUVPixel.fromYUVToRGB"""
+    return fromYUVToRGB(*yuyvPlanes(image))
+
+
+def yuyvToGrayscale(image: NDArray[np.uint8]) -> NDArray[np.uint8]:
+    """Y plane (height, width * 2) of a YUYV image, as YUYVPixel.greyscale"""
+    return np.ascontiguousarray(image[:, :, 0])
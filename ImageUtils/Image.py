@@ -1,12 +1,137 @@
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
 from numpy import ndarray
+from numpy.typing import ArrayLike
+
+from . import ColorModelConversions
+from .ImagePayload import ImagePayload
 
 
 class Image:
     def __init__(self, width: int = 0, height: int = 0, padding: int = 0):
         self.width: int
         self.height: int
-        self.image: ndarray
+        self._image: Optional[ndarray] = None
+        self.payload: Optional[ImagePayload] = None
+        """Lazy handle of the pixel bytes, image is only decoded (or copied) from it when it is accessed"""
 
     def setResolution(self, width, height):
         self.width = width
         self.height = height
+
+    @property
+    def image(self) -> ndarray:
+        if self._image is not None:
+            return self._image
+        if self.payload is None:
+            raise AttributeError(f"{type(self).__name__} has no image")
+        if self.payload.key is None:  # Bytes backed, nothing to re-read from, keep it
+            self._image = self.payload.decode(self.decodePayload)
+            return self._image
+        return self.payload.decode(self.decodePayload)
+
+    @image.setter
+    def image(self, value: ndarray):
+        self._image = value
+
+    @property
+    def isDecoded(self) -> bool:
+        return self._image is not None
+
+    def decode(self) -> ndarray:
+        """Decode the image now and keep it in this object (instead of only in ImagePayload's cache)"""
+        self._image = self.image
+        return self._image
+
+    # Vectorized pixel access, the same values as the per pixel methods of CameraImage, see ColorModelConversions
+    def yuvPlanes(self) -> Tuple[ndarray, ndarray, ndarray]:
+        """Y, U and V planes (height, width * 2)"""
+        return ColorModelConversions.yuyvPlanes(self.image)
+
+    def getYUVs(self, xs: ArrayLike, ys: ArrayLike) -> ndarray:
+        """(Y, U, V) of the pixels (xs[i], ys[i]), shape (N, 3)"""
+        return ColorModelConversions.yuyvPixels(self.image, xs, ys)
+
+    def getRGBs(self, xs: ArrayLike, ys: ArrayLike) -> ndarray:
+        """(R, G, B) of the pixels (xs[i], ys[i]), shape (N, 3), as YUVPixel.fromYUVToRGB"""
+        yuv = self.getYUVs(xs, ys)
+        return ColorModelConversions.fromYUVToRGB(yuv[..., 0], yuv[..., 1], yuv[..., 2])
+
+    def toRGB(self) -> ndarray:
+        """RGB image with the integer coefficients of YUVPixel.fromYUVToRGB (rgbImage uses OpenCV's)"""
+        return ColorModelConversions.yuyvToRGB(self.image)
+
+    def getGrayscaled(self) -> ndarray:
+        """Y plane (height, width * 2)"""
+        return ColorModelConversions.yuyvToGrayscale(self.image)
+
+    # Extraction
+    def extract(
+        self,
+        scale: int = 1,
+        grayscale: bool = False,
+        crop: Optional[Tuple[int, int, int, int]] = None,
+    ) -> ndarray:
+        """
+        Downscaled and/or cropped image, only the kept pixels are converted
+        scale: keep every scale-th pixel in both directions; grayscale: only the Y channel (HxW) instead of RGB (HxWx3)
+        crop: (x, y, width, height) in pixels of the full resolution image, applied before scaling
+        With the defaults it is the same as rgbImage
+        """
+        if scale < 1:
+            raise ValueError(f"scale must be at least 1, got {scale}")
+        yuyv, reduce = self.reducedYUYV(scale)
+        x, y, width, height = (int(value) for value in (crop or (0, 0, self.width * 2, self.height)))
+        # Crop in pixels of the reduced image, rounded outwards, then clipped to it
+        left, top = max(0, x // reduce), max(0, y // reduce)
+        right = min(yuyv.shape[1], -(-(x + width) // reduce))
+        bottom = min(yuyv.shape[0], -(-(y + height) // reduce))
+        if right <= left or bottom <= top:
+            raise ValueError(f"Crop {crop} is outside of the {int(self.width) * 2}x{self.height} image")
+        return self.subsampleYUYV(yuyv, left, top, right - left, bottom - top, scale // reduce, grayscale)
+
+    def reducedYUYV(self, scale: int) -> Tuple[ndarray, int]:
+        """@Override: YUYV array scaled down by reduce (a divisor of scale) and reduce, by default the full image"""
+        return self.image, 1
+
+    @staticmethod
+    def subsampleYUYV(
+        yuyv: ndarray, x: int, y: int, width: int, height: int, step: int, grayscale: bool
+    ) -> ndarray:
+        """Every step-th pixel of the (x, y, width, height) area of a YUYV array, as Y (grayscale) or RGB"""
+        rows = yuyv[y : y + height : step]
+        if step == 1 and not grayscale and x % 2 == 0 and width % 2 == 0:  # Whole YUYV pairs, convert as they are
+            return cv2.cvtColor(np.ascontiguousarray(rows[:, x : x + width]), cv2.COLOR_YUV2RGB_YUYV)
+        columns = np.arange(x, x + width, step)
+        luma = rows[:, columns, 0]
+        if grayscale:
+            return luma
+        # Every kept pixel becomes a YUYV pair of its own, with the chroma of the pair it was in
+        pairs = columns & ~1
+        pixels = np.empty((len(rows), len(columns), 2, 2), dtype=np.uint8)
+        pixels[:, :, 0, 0] = luma
+        pixels[:, :, 1, 0] = luma
+        pixels[:, :, 0, 1] = rows[:, pairs, 1]
+        pixels[:, :, 1, 1] = rows[:, pairs + 1, 1]
+        rgb = cv2.cvtColor(pixels.reshape((len(rows), len(columns) * 2, 2)), cv2.COLOR_YUV2RGB_YUYV)
+        return np.ascontiguousarray(rgb[:, ::2])
+
+    def decodePayload(self, data: bytes) -> ndarray:
+        """@Override: Pixel bytes of the payload to the image array"""
+        raise NotImplementedError(f"{type(self).__name__} does not decode payloads")
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        if state.get("payload") is not None and state["payload"].key is not None:
+            state["_image"] = None  # Decoded again from the log file, keeps the pickle small
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        if "image" in state:  # Pickled before images were lazy
+            state["_image"] = state.pop("image")
+        state.setdefault("_image", None)
+        state.setdefault("payload", None)
+        state.pop("data", None)  # Compressed bytes of JPEGImage, the payload holds them now
+        self.__dict__.update(state)
@@ -0,0 +1,107 @@
+import io
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from StreamUtils import StreamUtil
+from Utils import BoundedCache, MemoryMappedFile
+
+
+class ImagePayload:
+    """
+    Lazy handle of the pixel bytes of an image message: (sourcePath, offset, length) in the log file,
+    or the bytes themselves if the stream that read the image has no file behind it (StreamUtil.sourcePath is None)
+    It pickles as the handle, the file is mapped on the first read. Decoded images of file backed payloads are kept
+    in a small LRU BoundedCache shared by all payloads, so repeated image accesses do not decode again
+    """
+
+    cacheSize: int = 16
+    """Number of decoded images kept, 0 disables the cache"""
+    cacheBytes: Optional[int] = None
+    """Estimated bytes of decoded images kept, None for no limit besides cacheSize"""
+
+    _files_cached: Dict[str, MemoryMappedFile] = {}
+    _decoded_cached = BoundedCache(maxEntries=cacheSize, maxBytes=cacheBytes)
+    _lock = Lock()
+
+    def __init__(
+        self,
+        length: int,
+        sourcePath: Optional[str] = None,
+        offset: int = 0,
+        data: Optional[bytes] = None,
+    ):
+        if sourcePath is None and data is None:
+            raise ValueError("An ImagePayload needs either a sourcePath or its data")
+        self.length = length
+        self.sourcePath = sourcePath
+        self.offset = offset
+        self.data = data
+
+    @classmethod
+    def fromStream(cls, sutil: StreamUtil, length: int) -> "ImagePayload":
+        """Take the next length bytes of the stream, only a handle if the stream knows its file"""
+        sourcePath = getattr(sutil, "sourcePath", None)
+        if sourcePath is None:
+            return cls(length, data=sutil.read(length))
+        if sutil.remainingSize() < length:
+            raise EOFError("Not enough data to read")
+        payload = cls(length, sourcePath, sutil.tell())
+        sutil.seek(length, io.SEEK_CUR)
+        return payload
+
+    @property
+    def key(self) -> Optional[Tuple[str, int]]:
+        """Key of the decoded image in the cache, None if the payload holds its bytes"""
+        return None if self.sourcePath is None else (self.sourcePath, self.offset)
+
+    def _file(self) -> MemoryMappedFile:
+        file = self._files_cached.get(self.sourcePath)  # type: ignore sourcePath is set
+        if file is None:
+            with self._lock:
+                file = self._files_cached.get(self.sourcePath)  # type: ignore
+                if file is None:
+                    file = self._files_cached[self.sourcePath] = MemoryMappedFile(self.sourcePath)  # type: ignore
+        return file
+
+    def read(self) -> bytes:
+        if self.data is not None:
+            return self.data
+        return self._file().getData()[self.offset : self.offset + self.length]
+
+    def view(self) -> memoryview:
+        """Zero-copy view of the bytes, for reading a part of them, drop it after use (it pins the mapping)"""
+        if self.data is not None:
+            return memoryview(self.data)
+        return memoryview(self._file().getData())[self.offset : self.offset + self.length]
+
+    def decode(self, decoder: Callable[[bytes], np.ndarray]) -> np.ndarray:
+        """decoder(bytes) -> image, the result is served from the cache when it is there"""
+        key = self.key
+        if key is None or self.cacheSize <= 0:
+            return decoder(self.read())
+        with self._lock:
+            image = self._decoded_cached.get(key)
+        if image is not None:
+            return image
+        image = decoder(self.read())
+        with self._lock:
+            # The bounds follow cacheSize / cacheBytes, they may have been changed after the class was created
+            self._decoded_cached.maxEntries = self.cacheSize
+            self._decoded_cached.maxBytes = self.cacheBytes
+            self._decoded_cached.put(key, image)
+        return image
+
+    @classmethod
+    def cacheStats(cls) -> Dict[str, int]:
+        """Entries, estimated bytes, hits, misses and evictions of the decoded image cache"""
+        with cls._lock:
+            return cls._decoded_cached.stats()
+
+    @classmethod
+    def clearCache(cls) -> None:
+        """Drop the decoded images and unmap the files"""
+        with cls._lock:
+            cls._decoded_cached.clear()
+            cls._files_cached.clear()
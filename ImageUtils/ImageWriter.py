@@ -0,0 +1,155 @@
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Any, Deque, Dict, Optional
+
+import numpy as np
+from PIL import PngImagePlugin
+from PIL.Image import fromarray
+
+from Utils import dumpJsonBytes
+
+from .JPEGImage import JPEGImage
+
+imageFormats: Dict[str, str] = {"png": ".png", "webp": ".webp", "raw": "", "npy": ".npy"}
+"""Extension of every format, raw keeps the logged encoding (.jpg for JPEGImage, .npy for CameraImage)"""
+
+
+class ImageWriter:
+    """
+    Write the images of CameraImage / JPEGImage objects with the metadata of their frame, encoding runs on a thread pool
+    (PIL and libjpeg release the GIL), so it overlaps with parsing the next frames
+
+    format: png, webp, raw (the logged bytes, nothing is decoded: the JPEG of a JPEGImage, which PIL reads as inverted
+        CMYK YUYV, see JPEGDecoder; the YUYV array of a CameraImage as .npy) or npy (the YUYV array)
+    sidecar: write the metadata to metadata-<workerId>.jsonl (one {"image": fileName, <class name>: ...} line per image)
+        next to the images instead of PNG tEXt chunks, always on for formats other than png
+    extractOptions: arguments of Image.extract(), npy then stores the extracted RGB / Y array
+    """
+
+    numThreads: int = 2
+    """Encoding threads of one writer, the CLI runs one writer per worker process"""
+    pendingPerThread: int = 4
+    """Images queued per thread before write() waits, bounds the memory held by queued images"""
+    webpQuality: int = 90
+    """WebP quality (0-100) when quality is not given"""
+
+    def __init__(
+        self,
+        format: str = "png",
+        sidecar: bool = False,
+        compressLevel: Optional[int] = None,
+        quality: Optional[int] = None,
+        extractOptions: Optional[Dict[str, Any]] = None,
+        numThreads: Optional[int] = None,
+        workerId: int = 0,
+        slientFail: bool = False,
+    ):
+        """compressLevel: zlib level of PNGs (0-9, None for PIL's default 6), 1 is several times faster"""
+        if format not in imageFormats:
+            raise ValueError(f"Unknown image format: {format}, valid options are: {list(imageFormats)}")
+        if format == "raw" and extractOptions:
+            raise ValueError("The raw image format writes the logged bytes, it can not be downscaled or cropped")
+        self.format = format
+        self.sidecar = sidecar or format != "png"
+        self.compressLevel = compressLevel
+        self.quality = quality if quality is not None else self.webpQuality
+        self.extractOptions = extractOptions
+        self.numThreads = numThreads if numThreads is not None else self.numThreads
+        self.workerId = workerId
+        self.slientFail = slientFail
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Deque[Future] = deque()
+        self._sidecarFiles: Dict[Path, IO[bytes]] = {}
+
+    def fileName(self, image: Any, name: str) -> str:
+        """name with the extension of the format"""
+        extension = imageFormats[self.format]
+        if self.format == "raw":
+            extension = ".jpg" if isinstance(image, JPEGImage) else ".npy"
+        return Path(name).with_suffix(extension).name
+
+    def write(self, image: Any, dir: Path, name: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Queue the image (a CameraImage / JPEGImage) to be written to dir under name (its extension is replaced)
+        metadata: {class name: message} of the frame, e.g. CameraInfo, CameraMatrix; both the PNG text chunks (str())
+            and the sidecar lines hold the message's reprDict
+        """
+        os.makedirs(dir, exist_ok=True)
+        fileName = self.fileName(image, name)
+        pngInfo = None
+        if metadata:
+            if self.sidecar:
+                self.writeSidecar(Path(dir), fileName, metadata)
+            else:
+                pngInfo = PngImagePlugin.PngInfo()
+                for className, obj in metadata.items():
+                    pngInfo.add_text(className, str(obj))
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.numThreads)
+        while len(self._pending) >= self.numThreads * self.pendingPerThread:
+            self._wait(self._pending.popleft())
+        self._pending.append(self._executor.submit(self.save, image, os.path.join(dir, fileName), pngInfo))
+
+    def save(self, image: Any, path: str, pngInfo: Optional[PngImagePlugin.PngInfo] = None) -> None:
+        """Encode and write one image, in the calling thread"""
+        if self.format == "raw":
+            if isinstance(image, JPEGImage):
+                with open(path, "wb") as file:
+                    file.write(image.payload.read())
+            else:
+                np.save(path, image.image)
+            return
+        array = image.extract(**self.extractOptions) if self.extractOptions else None
+        if self.format == "npy":
+            np.save(path, array if array is not None else image.image)
+            return
+        pilImage = fromarray(array if array is not None else image.rgbImage)
+        if self.format == "png":
+            params: Dict[str, Any] = {"pnginfo": pngInfo}
+            if self.compressLevel is not None:
+                params["compress_level"] = self.compressLevel
+            pilImage.save(path, format="PNG", **params)
+        else:
+            pilImage.save(path, format="WEBP", quality=self.quality)
+
+    def writeSidecar(self, dir: Path, fileName: str, metadata: Dict[str, Any]) -> None:
+        file = self._sidecarFiles.get(dir)
+        if file is None:
+            # Truncated: a re-run into the same directory rewrites the images as well
+            file = self._sidecarFiles[dir] = open(dir / f"metadata-{self.workerId:03d}.jsonl", "wb")
+        line = {"image": fileName, **{className: obj.reprDict for className, obj in metadata.items()}}
+        file.write(dumpJsonBytes(line) + b"\n")
+
+    def _wait(self, future: Future) -> None:
+        try:
+            future.result()
+        except Exception:
+            if not self.slientFail:
+                raise
+
+    def flush(self) -> None:
+        """Wait until every queued image is written"""
+        while self._pending:
+            self._wait(self._pending.popleft())
+        for file in self._sidecarFiles.values():
+            file.flush()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            for file in self._sidecarFiles.values():
+                file.close()
+            self._sidecarFiles = {}
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,103 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL.Image import Image, open
+
+from StreamUtils import BufferCursor
+
+
+class JPEGDecoder:
+    """
+    Decoder of the YUYV images that the robots store as 4 channel (CMYK) JPEGs
+
+    PIL reads these JPEGs as CMYK with the channels inverted (255 - value). Instead of inverting the decoded array
+    afterwards (one more full size pass and copy), the raw mode of the decoder is swapped with its inverted
+    counterpart, so libjpeg's output is unpacked straight into the YUYV values.
+    Batch decoding runs on a thread pool, PIL releases the GIL while libjpeg decodes.
+    """
+
+    numThreads: int = os.cpu_count() or 1
+    """Threads of the batch decoding pool (decodeMany, decodeImages) when numThreads is not given"""
+    invertedRawModes = {"CMYK": "CMYK;I", "CMYK;I": "CMYK"}
+    """Raw mode PIL would use: the one that unpacks it inverted"""
+
+    def __init__(self, numThreads: Optional[int] = None):
+        self.numThreads = numThreads if numThreads is not None else self.numThreads
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def openJPEG(cls, data: Union[bytes, memoryview], reduce: int = 1) -> Tuple[Image, bool]:
+        """
+        Open without decoding, returns the image and whether the inversion is fused into its decoder
+        reduce: 1, 2, 4 or 8, scale the image down by it in the DCT domain (libjpeg skips the high frequencies)
+        """
+        rawImg = open(BytesIO(data), formats=["JPEG"])  # PIL deduce it is CMYK but it is actually YUYV
+        if reduce > 1:
+            rawImg.draft(rawImg.mode, (max(1, rawImg.width // reduce), max(1, rawImg.height // reduce)))
+        inverted = all(tile[3][0] in cls.invertedRawModes for tile in rawImg.tile)
+        if inverted:
+            rawImg.tile = [
+                (name, extents, offset, (cls.invertedRawModes[args[0]], *args[1:]))
+                for name, extents, offset, args in rawImg.tile
+            ]
+        return rawImg, inverted
+
+    @classmethod
+    def decode(cls, data: Union[bytes, memoryview], shape: Tuple[int, ...]) -> np.ndarray:
+        """Decode one JPEG into a YUYV array of shape (rows, columns, 2), read-only like CameraImage.image"""
+        rawImg, inverted = cls.openJPEG(data)
+        image = np.frombuffer(rawImg.tobytes(), dtype=np.uint8).reshape(shape)
+        return image if inverted else 255 - image  # Unknown raw mode, fall back to inverting afterwards
+
+    @classmethod
+    def decodeReduced(cls, data: Union[bytes, memoryview], reduce: int) -> np.ndarray:
+        """
+        Decode one JPEG scaled down by reduce (1, 2, 4 or 8) in the DCT domain, into a YUYV array
+        Every JPEG pixel holds one YUYV pair, so the array is (rows, 2 * JPEG columns, 2) at the reduced size
+        """
+        rawImg, inverted = cls.openJPEG(data, reduce)
+        image = np.frombuffer(rawImg.tobytes(), dtype=np.uint8).reshape((rawImg.height, rawImg.width * 2, 2))
+        return image if inverted else 255 - image
+
+    # Batch decoding
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.numThreads)
+        return self._executor
+
+    def decodeMany(self, items: Iterable[Tuple[Union[bytes, memoryview], Tuple[int, ...]]]) -> List[np.ndarray]:
+        """Decode (data, shape) pairs on the thread pool, results keep the given order"""
+        return list(self.executor.map(lambda item: self.decode(*item), items))
+
+    def decodeImages(self, images: Iterable[Any]) -> List[Any]:
+        """Decode the payloads of JPEGImage objects into the objects (Image.decode()), on the thread pool"""
+        images = list(images)
+        for _ in self.executor.map(lambda image: image.decode(), images):
+            pass
+        return images
+
+    def decodeMessages(self, messages: Iterable[Any]) -> List[Any]:
+        """
+        Read and decode the JPEGImage of every message, headers are read in the calling thread, decoding runs on
+        the thread pool. Returns the JPEGImage objects in message order, they are not cached.
+        """
+        images = []
+        for message in messages:
+            with BufferCursor(message.logBytes, message.startByte + 4, sourcePath=message.log.logFilePath) as sutil:
+                images.append(message.classType.read(sutil, message.endByte))
+        return self.decodeImages(images)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
@@ -1,14 +1,16 @@
-from io import BytesIO
+from typing import Any, Dict, Optional, Tuple
 
 import cv2
 import numpy as np
-from PIL.Image import fromarray, open
+from PIL.Image import fromarray
 
 from LogInterface import DataClass
 from Primitive import *
 from StreamUtils import StreamUtil
 
 from .Image import Image as ImageBase
+from .ImagePayload import ImagePayload
+from .JPEGDecoder import JPEGDecoder
 
 
 class JPEGImage(ImageBase, DataClass):
@@ -49,16 +51,25 @@ class JPEGImage(ImageBase, DataClass):
         jpegImage.setResolution(width, height * 2)
         jpegImage.timestamp = int(timestamp)
 
-        rawImg = open(
-            BytesIO(sutil.read(jpegImage.size)), formats=["JPEG"]
-        )  # PIL deduce it is CMYK but it is actually YUYV
-        jpegImage.image = 255 - np.array(rawImg).reshape((height * 2, width * 2, 2))
+        jpegImage.payload = ImagePayload.fromStream(sutil, jpegImage.size)
 
         if sutil.tell() != end:
             raise ValueError("Buffer Size not used up")
 
         return jpegImage
 
+    def decodePayload(self, data: bytes) -> np.ndarray:
+        return JPEGDecoder.decode(data, (self.height, self.width * 2, 2))
+
+    def reducedYUYV(self, scale: int) -> Tuple[np.ndarray, int]:
+        """The JPEG is decoded at 1/2, 1/4 or 1/8 of its size if scale allows it, libjpeg does the scaling"""
+        reduce = 8
+        while scale % reduce:
+            reduce //= 2
+        if reduce == 1 or self.isDecoded or self.payload is None:
+            return self.image, 1
+        return JPEGDecoder.decodeReduced(self.payload.read(), reduce), reduce
+
     def asDict(self):
         return {
             "width": self.width,
@@ -84,9 +95,10 @@ class JPEGImage(ImageBase, DataClass):
         else:
             raise ValueError("self.image is not an valid image")
 
-    def saveImage(self, path, metadata=None, slientFail=False):
+    def saveImage(self, path, metadata=None, slientFail=False, extractOptions: Optional[Dict[str, Any]] = None):
+        """extractOptions: arguments of extract() to save a downscaled / grayscale / cropped image"""
         try:
-            img = fromarray(self.rgbImage)
+            img = fromarray(self.extract(**extractOptions) if extractOptions else self.rgbImage)
             img.save(
                 path,
                 pnginfo=metadata,
@@ -1,2 +1,5 @@
+from . import ColorModelConversions
 from .CameraImage import CameraImage
+from .JPEGDecoder import JPEGDecoder
 from .JPEGImage import JPEGImage
+from .ImageWriter import ImageWriter, imageFormats
@@ -1,7 +1,7 @@
 import json
 from abc import ABCMeta, abstractmethod
 from enum import EnumMeta
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import numpy as np
 
@@ -22,6 +22,11 @@ class DataClass:
 
     readInstructions: List[ReadInstruction]
 
+    fixedDtype: Optional[np.dtype] = None
+    """Structured dtype of the whole class if all its fields have a fixed size, set by the generated LogClasses"""
+    segmentDtypes: List[np.dtype] = []
+    """Structured dtypes of runs of fixed size fields in a variable size class, set by the generated LogClasses"""
+
     def __init__(self):
         pass
 
@@ -18,6 +18,20 @@ Frames = Union[List[FrameInstance], "FrameAccessor"]
 
 
 class FrameAccessor(FrameBase, LogInterfaceAccessorClass):
+    frameIdxDtype = np.dtype(
+        [
+            ("frameIndex", np.uint32),
+            ("threadName", "S12"),
+            ("msgStart", np.uint64),
+            ("msgEnd", np.uint64),
+        ]
+    )
+    """Record layout of frameIndexFile, same bytes as encodeIndexBytes()"""
+    frameTypeBitmapFileName: str = "frameTypeBitmap.npy"
+    frameTypeOffsetsFileName: str = "frameTypeOffsets.npy"
+    frameTypeFirstIndexFileName: str = "frameTypeFirstIndex.npy"
+    frameTimestampFileName: str = "frameTimestamps.npy"
+
     @staticmethod
     def decodeIndexBytes(bytes: Union[bytes, bytearray]) -> Tuple[int, str, int, int]:
         if len(bytes) != FrameAccessor.frameIdxByteLength:
@@ -52,7 +66,8 @@ class FrameAccessor(FrameBase, LogInterfaceAccessorClass):
             result = self.log.getCachedInfo(self, key)
             if result is not None:
                 return result
-            result = super().__getitem__(key).copy()
+            # A new accessor instead of moving self.children, which may be shared by other threads
+            result = self.getMessageAccessor(self.messageRelIndexOf(key))
             self.log.cacheInfo(self, key, result.copy().freeze())
             return result
 
@@ -62,53 +77,68 @@ class FrameAccessor(FrameBase, LogInterfaceAccessorClass):
         else:
             return FrameBase.__contains__(self, key)
 
+    def messageRelIndex(self, logId: int) -> Optional[int]:
+        """Constant time, the rank of logId in the frame's bitmap locates it in frameTypeFirstIndex"""
+        absIndex = self.absIndex
+        words = self.log.frameTypeBitmap[absIndex].tolist()
+        word, bit = logId >> 6, logId & 63
+        if not (words[word] >> bit) & 1:
+            return None
+        rank = (words[word] & ((1 << bit) - 1)).bit_count()
+        for lowerWord in words[:word]:
+            rank += lowerWord.bit_count()
+        return int(
+            self.log.frameTypeFirstIndex[int(self.log.frameTypeOffsets[absIndex]) + rank]
+        )
+
     # Core
     @property
     def startByte(self) -> int:
-        return self.messages[0].startByte
+        return int(self.log.messageIndexArray[self.absMessageIndexStart]["startByte"])
 
     @property
     def endByte(self) -> int:
-        return self.messages[-1].endByte
+        return int(self.log.messageIndexArray[self.absMessageIndexEnd - 1]["endByte"])
 
     # Index file related
     @staticmethod
     def idxFileName() -> str:
         return FrameAccessor.frameIdxFileName
 
+    @property
+    def indexArray(self) -> np.ndarray:
+        return self.log.frameIndexArray
+
     @property
     def frameByteIndex(self) -> Tuple[int, str, int, int]:
         """
         [frameIndex, threadName, startMessageIndex, endByteMessageIndex]
         """
-        result = self.log.getCachedInfo(self, "frameByteIndex")
-        if result is not None:
-            return result
-
-        result = self.decodeIndexBytes(self.indexFileBytes)
-        self.log.cacheInfo(self, "frameByteIndex", result)
-        return result
+        frameIndex, threadName, msgStart, msgEnd = self.indexArray[self.absIndex].item()
+        return frameIndex, threadName.decode("ascii"), msgStart, msgEnd
 
     @property
     def indexFileBytes(self) -> bytes:
         """The bytes of current index in frameIndexFile, which store the start and end message index of the frame"""
-        byteIndex = self.absIndex * self.frameIdxByteLength
-        return self.getBytesFromMmap(
-            self.idxFile.getData(), byteIndex, byteIndex + self.frameIdxByteLength
-        )
+        return self.indexArray[self.absIndex].tobytes()
 
     @property
     def threadName(self) -> str:
         """The thread that generates this log frame"""
-        return self.frameByteIndex[1]
+        return self.indexArray[self.absIndex]["threadName"].decode("ascii")
 
     @property
     def absMessageIndexStart(self) -> int:
-        return self.frameByteIndex[2]
+        return int(self.indexArray[self.absIndex]["msgStart"])
 
     @property
     def absMessageIndexEnd(self) -> int:
-        return self.frameByteIndex[3]
+        return int(self.indexArray[self.absIndex]["msgEnd"])
+
+    @property
+    def threadNames(self) -> np.ndarray:
+        """Thread name (bytes) of every frame in indexMap"""
+        return self.indexRecords["threadName"]
 
     def verifyMessages(self):
         for i in range(len(self)):
@@ -117,6 +147,8 @@ class FrameAccessor(FrameBase, LogInterfaceAccessorClass):
     # Children
     @property
     def children(self) -> Messages:
+        if self._frozen:  # A handle can be shared between threads, don't hand out one movable accessor to all of them
+            return self.getMessageAccessor()
         if not hasattr(self, "_children") or self._children.frameIndex != self.absIndex:
             self._children = self.getMessageAccessor()
         return self._children
@@ -167,6 +199,12 @@ class FrameAccessor(FrameBase, LogInterfaceAccessorClass):
         """
         raise NotImplementedError("Not Implemented yet")
 
+    def prefetch(self, window: Optional[int] = None, pool: Any = None, sharedResults: bool = False):
+        """Iterate the frames of indexMap while the next window frames are parsed in the background, see FramePrefetcher"""
+        return import_module("LogInterface.FramePrefetcher").FramePrefetcher(
+            self, window, pool, sharedResults
+        )  # Static import would cause loop import
+
     # Derived properties
     @property
     def classNames(self) -> List[str]:
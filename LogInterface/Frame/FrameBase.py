@@ -3,13 +3,13 @@ import os
 from abc import abstractmethod
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 from PIL import PngImagePlugin
 
 from StreamUtils import StreamUtil
-from Utils import dumpJson
+from Utils import dumpJson, writeJson
 
 from ..Chunk import Chunk
 from ..DataClasses import Timer
@@ -45,13 +45,13 @@ class FrameBase(LogInterfaceBaseClass):
         return dumpJson(self.asDict(), indent=self.strIndent)
 
     def __contains__(self, key: Union[str, Enum]) -> bool:
-        for message in self.messages:
-            if (
-                message.className == key
-                if isinstance(key, str)
-                else message.id == key.value
-            ):
-                return True
+        if not isinstance(key, (str, Enum)):
+            return False
+        try:
+            logId = self.log.MessageIDChunk.getLogId(key)
+        except KeyError:
+            return False
+        return self.messageRelIndex(logId) is not None
 
     @abstractmethod  # Children class need to implement the int case seperately
     def __getitem__(self, key: Union[str, Enum]) -> MessageBase:
@@ -59,28 +59,30 @@ class FrameBase(LogInterfaceBaseClass):
         Allow to use [<message idx>/<message name>/<message id enum>] to access a message in the frame
         Special case for "Annotation": There might be multiple Annotations in a frame, so please use frame["Annotations"] or frame.Annotations to get them
         """
-        result = None
+        return self.messages[self.messageRelIndexOf(key)]
 
+    def messageRelIndexOf(self, key: Union[str, Enum]) -> int:
+        """Index in this frame's messages of the message a frame[key] lookup refers to, raise like __getitem__"""
         if key == "Annotation" or key == self.log.MessageID["idAnnotation"]:
             raise Exception(
                 "There might be multiple Annotations in a frame, please use frame.Annotations to get them"
             )
         elif isinstance(key, str) or isinstance(key, Enum):
-            for message in self.messages:
-                if (
-                    message.className == key
-                    if isinstance(key, str)
-                    else message.id == key.value
-                ):
-                    result = message
-                    break
-            if result is None:
+            try:
+                relIndex = self.messageRelIndex(self.log.MessageIDChunk.getLogId(key))
+            except KeyError:
+                relIndex = None
+            if relIndex is None:
                 raise KeyError(f"Message with key: {key} not found")
-            else:
-                return result
+            return relIndex
         else:
             raise KeyError(f"Invalid key type: {key}")
 
+    @abstractmethod
+    def messageRelIndex(self, logId: int) -> Optional[int]:
+        """Index in this frame's messages of the first message with logId, None if there is no such message"""
+        pass
+
     # def __getattribute__(self, name: str) -> MessageBase:
     #     try:
     #         result = super().__getattribute__(name)
@@ -369,7 +371,10 @@ class FrameBase(LogInterfaceBaseClass):
     def timestamp(self) -> int:
         """
         The time stamp of this frame, if it doesn't have a timestamp, use the timestamp of closest frame that has one
+        Accessors read it from the timestamp column of the log (interpolated and unwrapped during eval)
         """
+        if isinstance(self, LogInterfaceAccessorClass):
+            return int(self.log.frameTimestamps[self.absIndex])
 
         if (
             not hasattr(FrameBase, "_timestamps_cache")
@@ -537,8 +542,13 @@ class FrameBase(LogInterfaceBaseClass):
             else:
                 raise ValueError("This frame does not have an image")
 
-    def saveImageWithMetaData(self, dir=None, imgName=None, slientFail=False):
-        """Try to find some meta-data in this frame and write it along with the image in this frame into a PNG file"""
+    def saveImageWithMetaData(self, dir=None, imgName=None, slientFail=False, extractOptions=None, writer=None):
+        """
+        Try to find some meta-data in this frame and write it along with the image in this frame into a PNG file
+        extractOptions: arguments of Image.extract() to save a downscaled / grayscale / cropped image
+        writer: an ImageUtils.ImageWriter (other formats, sidecar metadata, encoding in threads), it has its own
+            extractOptions
+        """
         if self.hasImage is False:
             if slientFail:
                 return
@@ -550,24 +560,34 @@ class FrameBase(LogInterfaceBaseClass):
         if dir is None:
             dir = self.log.imageDir
 
-        metadata = None
+        metadataObjs = None
         try:
             # Try to get metadata in the frame
-            CameraInfo = self["CameraInfo"]
-            CameraMatrix = self["CameraMatrix"]
-            ImageCoordinateSystem = self["ImageCoordinateSystem"]
+            metadataObjs = {
+                "CameraInfo": self["CameraInfo"],
+                "CameraMatrix": self["CameraMatrix"],
+                "ImageCoordinateSystem": self["ImageCoordinateSystem"],
+            }
+        except KeyError:
+            pass
 
+        if writer is not None:
+            if self.imageMessage is not None:
+                writer.write(self.imageMessage.reprObj, dir, imgName, metadataObjs)  # type: ignore
+            return
+
+        metadata = None
+        if metadataObjs is not None:
             metadata = PngImagePlugin.PngInfo()
             # Add metadata (using the tEXt chunk)
             # TODO: here I directly write the json string, maybe there is a more compressed way
-            metadata.add_text("CameraInfo", str(CameraInfo))
-            metadata.add_text("CameraMatrix", str(CameraMatrix))
-            metadata.add_text("ImageCoordinateSystem", str(ImageCoordinateSystem))
-        except KeyError:
-            pass
+            for className, obj in metadataObjs.items():
+                metadata.add_text(className, str(obj))
 
         if self.imageMessage is not None:
-            self.imageMessage.saveImage(dir, imgName, metadata, slientFail=slientFail)  # type: ignore
+            self.imageMessage.saveImage(  # type: ignore
+                dir, imgName, metadata, slientFail=slientFail, extractOptions=extractOptions
+            )
 
     # JSON Utils
     @property
@@ -585,4 +605,4 @@ class FrameBase(LogInterfaceBaseClass):
             dir = self.log.frameDir
         os.makedirs(dir, exist_ok=True)
         with open(os.path.join(dir, fileName), "w") as f:
-            f.write(str(self))
+            writeJson(self.asDict(), f, indent=self.strIndent)  # Same content as str(self), streamed
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Any, List, Union
+from typing import Any, Dict, List, Optional, Union
 
 from StreamUtils import StreamUtil
 from Utils import isIntAlike
@@ -17,6 +17,7 @@ class FrameInstance(FrameBase, LogInterfaceInstanceClass):
 
         # cache
         self._absMessageIndexStart_cached: int
+        self._messageRelIndexes_cached: Dict[int, int]
 
     def __getitem__(self, key: Union[int, str, Enum]) -> FrameBase:
         if isIntAlike(key):
@@ -24,6 +25,13 @@ class FrameInstance(FrameBase, LogInterfaceInstanceClass):
         else:
             return super().__getitem__(key)
 
+    def messageRelIndex(self, logId: int) -> Optional[int]:
+        if not hasattr(self, "_messageRelIndexes_cached"):
+            self._messageRelIndexes_cached = {}
+            for relIndex, message in enumerate(self.messages):
+                self._messageRelIndexes_cached.setdefault(int(message.logId), relIndex)
+        return self._messageRelIndexes_cached.get(logId)
+
     # Core
     @property
     def threadName(self) -> str:
@@ -0,0 +1,73 @@
+from collections import deque
+from concurrent.futures import Future
+from typing import Deque, Iterator, Optional, Tuple
+
+from .Frame import FrameAccessor
+from .ParserPool import ParserPool
+from .SharedResultBatch import SharedResultBatch
+
+
+class FramePrefetcher:
+    """
+    Iterate a FrameAccessor while the messages of the next window frames are parsed by a ParserPool
+    Every frame is one pool task, at most window tasks are in flight (backpressure), the results of a frame are
+    put into the log's info cache right before the frame is yielded, so a small reprObj cache is not flushed
+    by frames the consumer has not reached yet.
+    Abandoning the iteration (break, close(), garbage collection) cancels the tasks still in flight.
+    """
+
+    defaultWindow: int = 32
+    """Frames parsed ahead of the consumer when window is not given"""
+
+    def __init__(
+        self,
+        frames: FrameAccessor,
+        window: Optional[int] = None,
+        pool: Optional[ParserPool] = None,
+        sharedResults: bool = False,
+    ):
+        """pool: an existing pool to use, if None a pool is created for this iteration and shut down after it"""
+        self.frames = frames
+        self.window = window if window is not None else self.defaultWindow
+        self.pool = pool
+        self.sharedResults = sharedResults
+
+    def __iter__(self) -> Iterator[FrameAccessor]:
+        log = self.frames.log
+        ownPool = self.pool is None
+        pool = ParserPool.fromLog(log) if ownPool else self.pool
+        frameIndexArray = log.frameIndexArray
+        messageIndexArray = log.messageIndexArray
+        messageLogIds = log.messageLogIds
+        absIndexes = list(self.frames.indexMap)
+        inFlight: Deque[Tuple[int, int, Future]] = deque()
+        nextToSubmit = 0
+
+        def submitUpTo(end: int):
+            nonlocal nextToSubmit
+            while nextToSubmit < min(end, len(absIndexes)):
+                _, _, msgStart, msgEnd = frameIndexArray[absIndexes[nextToSubmit]].item()
+                records = messageIndexArray[msgStart:msgEnd]
+                tasks = ParserPool.makeTasks(
+                    records["startByte"] + 4, records["endByte"], messageLogIds[msgStart:msgEnd]
+                )
+                inFlight.append((nextToSubmit, msgStart, pool.submit(tasks, self.sharedResults)))
+                nextToSubmit += 1
+
+        iterator = iter(self.frames)
+        try:
+            for index, frame in enumerate(iterator):
+                submitUpTo(index + 1 + self.window)
+                _, msgStart, future = inFlight.popleft()
+                results = future.result()
+                if self.sharedResults:
+                    results = SharedResultBatch(results).loadAll()
+                for offset, result in enumerate(results):
+                    log.messageHandle(msgStart + offset).reprObj = result
+                yield frame
+        finally:
+            for _, _, future in inFlight:
+                if not future.cancel() and self.sharedResults and not future.exception():
+                    SharedResultBatch(future.result()).release()  # Attach once so the segment is unlinked
+            if ownPool:
+                pool.shutdown(wait=False)
@@ -0,0 +1,397 @@
+import struct
+from io import BufferedWriter
+from mmap import mmap
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from Utils import MemoryMappedFile
+
+from .Frame import FrameAccessor
+from .Message import MessageAccessor
+
+
+class IndexScanner:
+    """
+    Batched replacement of the FrameInstance/MessageInstance walk in UncompressedChunk.evalFrameAccessor
+
+    The message chain still has to be followed header by header (every header tells where the next one is),
+    but that walk only collects start positions, everything else (logId decoding, frame boundary detection,
+    index record generation) is done on NumPy arrays of a whole batch and written with one write per batch.
+    The produced index files are byte-identical to the ones written by the FrameInstance based eval.
+    """
+
+    defaultBatchSize: int = 1 << 18
+    """Number of message headers walked before the batch is turned into index records"""
+    minShardSize: int = 1 << 26
+    """Smallest byte range given to one worker in scanSharded, smaller logs are scanned in this process"""
+    validateFrames: int = 2
+    """Number of complete frames a resynchronised message chain has to contain before it is trusted"""
+    maxThreadNameLength: int = 64
+
+    def __init__(
+        self,
+        buffer: mmap,
+        mapLogToID: Dict[int, int],
+        frameBeginID: int,
+        frameFinishedID: int,
+        numMessageIDs: int,
+        batchSize: Optional[int] = None,
+    ):
+        self.buffer = buffer
+        self.bufferSize = len(buffer)
+        # Everything needed to rebuild this scanner on another mapping of the same log, see scanSharded
+        self.config = (mapLogToID, frameBeginID, frameFinishedID, numMessageIDs, batchSize)
+        self.batchSize = batchSize if batchSize is not None else self.defaultBatchSize
+        self.numMessageIDs = numMessageIDs
+
+        # Lookup tables indexed by logId
+        self.isFrameBegin = np.zeros(256, dtype=np.bool_)
+        self.isFrameFinished = np.zeros(256, dtype=np.bool_)
+        self.isInvalid = np.ones(256, dtype=np.bool_)
+        for logId, id in mapLogToID.items():
+            self.isFrameBegin[logId] = id == frameBeginID
+            self.isFrameFinished[logId] = id == frameFinishedID
+            self.isInvalid[logId] = logId == 255 or logId > numMessageIDs
+
+        self._bytes: NDArray[np.uint8] = np.frombuffer(buffer, dtype=np.uint8)
+
+    @classmethod
+    def fromLog(cls, log, batchSize: Optional[int] = None) -> "IndexScanner":
+        MessageID = log.MessageID
+        return cls(
+            log.logBytes,
+            log.MessageIDChunk.mapLogToID,
+            MessageID.idFrameBegin.value,
+            MessageID.idFrameFinished.value,
+            len(MessageID),
+            batchSize,
+        )
+
+    # Header walk
+    def walkHeaders(self, pos: int, maxMessages: int) -> Tuple[NDArray[np.int64], int, bool]:
+        """
+        Follow the message chain from pos for at most maxMessages messages
+        Returns (start positions, position after the last message, whether the end of the log was hit)
+        A message that would reach the end of the log counts as end of log, same as MessageInstance.eval
+        """
+        unpack = struct.Struct("<I").unpack_from
+        buffer = self.buffer
+        bufferSize = self.bufferSize
+        starts = []
+        append = starts.append
+        atEnd = False
+        for _ in range(maxMessages):
+            if pos + 4 > bufferSize:
+                atEnd = True
+                break
+            end = pos + 4 + (unpack(buffer, pos)[0] >> 8)
+            if end >= bufferSize:
+                atEnd = True
+                break
+            append(pos)
+            pos = end
+        return np.array(starts, dtype=np.int64), pos, atEnd
+
+    def threadNameBytes(self, finishStart: int, finishEnd: int) -> bytes:
+        """Thread name stored in a FrameBegin/FrameFinished body (skip header and string length)"""
+        return self.buffer[finishStart + 8 : finishEnd]
+
+    # Frame detection
+    def detectFrames(
+        self, starts: NDArray[np.int64], ends: NDArray[np.int64], scanStart: int, limit: int
+    ) -> Tuple[NDArray[np.int64], NDArray[np.int64], int, bool]:
+        """
+        Find the frames in a batch of messages that starts at a frame boundary
+        Returns (index of FrameBegin, index of FrameFinished, number of messages consumed, whether the limit is reached)
+        Messages after the last complete frame are not consumed, the walk has to continue from there
+        """
+        logIds = self._bytes[starts]
+        finishIdx = np.flatnonzero(self.isFrameFinished[logIds])
+        beginIdx = np.flatnonzero(self.isFrameBegin[logIds])
+
+        # Frames only start while the (relative) byte position is still below the used size of the chunk
+        frameStarts = np.empty(len(finishIdx), dtype=np.int64)
+        if len(finishIdx):
+            frameStarts[0] = scanStart
+            frameStarts[1:] = ends[finishIdx[:-1]]
+        numFrames = int(np.searchsorted(frameStarts, limit, side="left"))
+        finishIdx = finishIdx[:numFrames]
+        consumed = int(finishIdx[-1]) + 1 if numFrames else 0
+        stopped = (int(ends[consumed - 1]) if consumed else scanStart) >= limit
+
+        # Messages that are looked at before the walk stops, either belongs to a frame or the trailing partial frame
+        checked = consumed if stopped else len(starts)
+
+        # Double FrameBegin: only the last one before a FrameFinished starts the frame, the rest are dummy messages
+        beginPos = np.searchsorted(beginIdx, finishIdx, side="left") - 1
+        previousFinish = np.empty_like(finishIdx)
+        if numFrames:
+            previousFinish[0] = -1
+            previousFinish[1:] = finishIdx[:-1]
+        frameBegin = beginIdx[np.maximum(beginPos, 0)] if len(beginIdx) else np.zeros_like(finishIdx)
+        hasBegin = (beginPos >= 0) & (frameBegin > previousFinish)
+
+        # Report the first error in stream order, like the message by message eval would
+        invalid = np.flatnonzero(self.isInvalid[logIds[:checked]])
+        firstInvalid = int(invalid[0]) if len(invalid) else checked
+        for frame in range(numFrames):
+            finish = int(finishIdx[frame])
+            if finish > firstInvalid:
+                break
+            begin = int(frameBegin[frame])
+            if not hasBegin[frame] or self.threadNameBytes(
+                int(starts[begin]), int(ends[begin])
+            ) != self.threadNameBytes(int(starts[finish]), int(ends[finish])):
+                raise Exception(f"Frame end without frame begin at {int(ends[finish])}")
+        if firstInvalid < checked:
+            logId = int(logIds[firstInvalid])
+            if logId == 255:
+                raise Exception(
+                    "Found Message without MessageID, probably because a representation is included in logger.cfg but not assigned a id in MessageIDs.h"
+                )
+            raise Exception(f"Current id not valid:{logId} > {self.numMessageIDs}")
+
+        return frameBegin, finishIdx, consumed, stopped
+
+    # Index records
+    def encodeRecords(
+        self,
+        starts: NDArray[np.int64],
+        ends: NDArray[np.int64],
+        frameBegin: NDArray[np.int64],
+        frameFinished: NDArray[np.int64],
+        frameCnt: int,
+        messageCnt: int,
+    ) -> Tuple[NDArray, NDArray]:
+        """Build the message and frame index records of the detected frames, dummy messages are skipped"""
+        counts = frameFinished - frameBegin + 1
+        numMessages = int(counts.sum())
+        frameMessageStart = np.cumsum(counts) - counts
+
+        messageFrame = np.repeat(np.arange(len(counts)), counts)
+        local = np.repeat(frameBegin, counts) + (
+            np.arange(numMessages) - np.repeat(frameMessageStart, counts)
+        )
+
+        messageRecords = np.empty(numMessages, dtype=MessageAccessor.messageIdxDtype)
+        messageRecords["absIndex"] = np.arange(messageCnt, messageCnt + numMessages)
+        messageRecords["frameIndex"] = messageFrame + frameCnt
+        messageRecords["startByte"] = starts[local]
+        messageRecords["endByte"] = ends[local]
+
+        frameRecords = np.empty(len(counts), dtype=FrameAccessor.frameIdxDtype)
+        frameRecords["frameIndex"] = np.arange(frameCnt, frameCnt + len(counts))
+        frameRecords["threadName"] = [
+            self.threadNameBytes(int(starts[finish]), int(ends[finish]))
+            for finish in frameFinished
+        ]
+        frameRecords["msgStart"] = frameMessageStart + messageCnt
+        frameRecords["msgEnd"] = frameMessageStart + counts + messageCnt
+        return messageRecords, frameRecords
+
+    def scan(
+        self,
+        pos: int,
+        limit: int,
+        frameCnt: int,
+        messageCnt: int,
+        messageIdxFile: BufferedWriter,
+        frameIdxFile: BufferedWriter,
+        sutil=None,
+    ) -> Tuple[int, int, int]:
+        """
+        Index all frames starting from pos (must be a frame boundary), new frames are only started below limit
+        If a StreamUtil is given, it is moved along with the scan, which also drives its progress bar
+        Returns (position where the walk stopped, frameCnt, messageCnt)
+        """
+        batchSize = self.batchSize
+        while pos < limit:
+            starts, walkEnd, atEnd = self.walkHeaders(pos, batchSize)
+            ends = np.empty_like(starts)
+            ends[:-1] = starts[1:]
+            if len(starts):
+                ends[-1] = walkEnd
+
+            frameBegin, frameFinished, consumed, stopped = self.detectFrames(
+                starts, ends, pos, limit
+            )
+            if len(frameFinished):
+                messageRecords, frameRecords = self.encodeRecords(
+                    starts, ends, frameBegin, frameFinished, frameCnt, messageCnt
+                )
+                messageIdxFile.write(messageRecords.tobytes())
+                frameIdxFile.write(frameRecords.tobytes())
+                frameCnt += len(frameRecords)
+                messageCnt += len(messageRecords)
+
+            if stopped:
+                pos = int(ends[consumed - 1]) if consumed else pos
+            elif atEnd:
+                pos = walkEnd  # The log ends inside a frame, it is dropped like an EOFError in FrameInstance.eval
+            elif consumed == 0:
+                batchSize *= 2  # A single frame is larger than the batch, walk further next time
+                continue
+            else:
+                pos = int(ends[consumed - 1])
+
+            if sutil is not None:
+                sutil.seek(pos)
+            if stopped or atEnd:
+                break
+        return pos, frameCnt, messageCnt
+
+    # Sharded scan
+    def validateFrameChain(self, pos: int) -> Optional[int]:
+        """
+        Check whether a FrameBegin header at pos starts a plausible message chain
+        Follows the chain through validateFrames complete frames (FrameBegin/FrameFinished thread names must match)
+        Returns the end of the first frame, which is a frame boundary of the sequential walk, or None
+        """
+        unpack = struct.Struct("<I").unpack_from
+        buffer = self.buffer
+        bufferSize = self.bufferSize
+        if pos + 8 > bufferSize:
+            return None
+        nameLength = unpack(buffer, pos + 4)[0]
+        if nameLength != (unpack(buffer, pos)[0] >> 8) - 4 or not (
+            0 < nameLength <= self.maxThreadNameLength
+        ):
+            return None
+
+        firstFrameEnd = None
+        frames = 0
+        threadName = None
+        while frames < self.validateFrames:
+            if pos + 4 > bufferSize:
+                return None
+            header = unpack(buffer, pos)[0]
+            logId = header & 0xFF
+            end = pos + 4 + (header >> 8)
+            if end >= bufferSize or self.isInvalid[logId]:
+                return None
+            if self.isFrameBegin[logId] or self.isFrameFinished[logId]:
+                name = self.threadNameBytes(pos, end)
+                if not name or not name.isascii() or not name.decode().isprintable():
+                    return None
+                if self.isFrameBegin[logId]:
+                    threadName = name
+                elif name != threadName:
+                    return None
+                else:
+                    frames += 1
+                    threadName = None
+                    if firstFrameEnd is None:
+                        firstFrameEnd = end
+            pos = end
+        return firstFrameEnd
+
+    def findFrameBoundary(self, pos: int, limit: int, window: int = 1 << 16) -> Optional[int]:
+        """Find the first frame boundary after an arbitrary byte position pos, None if there is none below limit"""
+        while pos < limit:
+            windowEnd = min(pos + window, limit)
+            candidates = np.flatnonzero(self.isFrameBegin[self._bytes[pos:windowEnd]]) + pos
+            for candidate in candidates:
+                boundary = self.validateFrameChain(int(candidate))
+                if boundary is not None:
+                    return boundary if boundary < limit else None
+            pos = windowEnd
+        return None
+
+    def findShardBoundaries(self, pos: int, limit: int, numShards: int) -> List[int]:
+        """Split [pos, limit) into at most numShards ranges that all start at a frame boundary"""
+        numShards = min(numShards, (limit - pos) // self.minShardSize)
+        boundaries = [pos]
+        for shard in range(1, numShards):
+            target = max(pos + (limit - pos) * shard // numShards, boundaries[-1])
+            boundary = self.findFrameBoundary(target, limit)
+            if boundary is None:
+                break
+            boundaries.append(boundary)
+        boundaries.append(limit)
+        return boundaries
+
+    def scanSharded(
+        self,
+        pos: int,
+        limit: int,
+        frameCnt: int,
+        messageCnt: int,
+        messageIdxFile: BufferedWriter,
+        frameIdxFile: BufferedWriter,
+        logFilePath: str,
+        shardDir: Path,
+        numWorkers: int,
+        sutil=None,
+    ) -> Tuple[int, int, int]:
+        """
+        Same as scan(), but the byte range is split at frame boundaries and every shard is scanned by its own process
+        Shard index files are stitched into the given files afterwards with renumbered indexes
+        Falls back to scan() if the log is too small or a shard does not end exactly where the next one starts
+        """
+        boundaries = self.findShardBoundaries(pos, limit, numWorkers)
+        numShards = len(boundaries) - 1
+        if numShards < 2:
+            return self.scan(pos, limit, frameCnt, messageCnt, messageIdxFile, frameIdxFile, sutil)
+
+        shardFiles = [
+            (
+                shardDir / f"{MessageAccessor.messageIdxFileName}.shard{shard}",
+                shardDir / f"{FrameAccessor.frameIdxFileName}.shard{shard}",
+            )
+            for shard in range(numShards)
+        ]
+        try:
+            with Pool(numShards) as pool:
+                results = pool.starmap(
+                    _scanShard,
+                    [
+                        (logFilePath, self.config, boundaries[shard], boundaries[shard + 1], *shardFiles[shard])
+                        for shard in range(numShards)
+                    ],
+                )
+        except Exception:
+            results = None  # The single process scan reports the error at the right position
+
+        if results is None or any(
+            results[shard][0] != boundaries[shard + 1] for shard in range(numShards - 1)
+        ):
+            for paths in shardFiles:
+                for path in paths:
+                    path.unlink(missing_ok=True)
+            return self.scan(pos, limit, frameCnt, messageCnt, messageIdxFile, frameIdxFile, sutil)
+
+        for (messageShardPath, frameShardPath), (_, shardFrames, shardMessages) in zip(shardFiles, results):
+            messageRecords = np.fromfile(messageShardPath, dtype=MessageAccessor.messageIdxDtype)
+            messageRecords["absIndex"] += messageCnt
+            messageRecords["frameIndex"] += frameCnt
+            frameRecords = np.fromfile(frameShardPath, dtype=FrameAccessor.frameIdxDtype)
+            frameRecords["frameIndex"] += frameCnt
+            frameRecords["msgStart"] += messageCnt
+            frameRecords["msgEnd"] += messageCnt
+            messageIdxFile.write(messageRecords.tobytes())
+            frameIdxFile.write(frameRecords.tobytes())
+            frameCnt += shardFrames
+            messageCnt += shardMessages
+            messageShardPath.unlink()
+            frameShardPath.unlink()
+
+        pos = results[-1][0]
+        if sutil is not None:
+            sutil.seek(pos)
+        return pos, frameCnt, messageCnt
+
+
+def _scanShard(
+    logFilePath: str, config: tuple, pos: int, limit: int, messageIdxPath: Path, frameIdxPath: Path
+) -> Tuple[int, int, int]:
+    """Worker of IndexScanner.scanSharded, indexes one shard into its own files with indexes starting at 0"""
+    file = MemoryMappedFile(logFilePath)
+    scanner = IndexScanner(file.getData(), *config)
+    with open(messageIdxPath, "wb") as messageIdxFile, open(frameIdxPath, "wb") as frameIdxFile:
+        result = scanner.scan(pos, limit, 0, 0, messageIdxFile, frameIdxFile)
+    del scanner  # Release its view on the mapping before the file is closed
+    return result
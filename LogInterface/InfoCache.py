@@ -0,0 +1,94 @@
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+from Utils import BoundedCache
+
+from .Message import MessageAccessor
+
+Namespace = Tuple[str, str]
+"""(object type, info name), e.g. ("Message", "reprObj")"""
+
+
+class InfoCache:
+    """
+    Cache of information derived by accessors (reprObj, reprDict, classNames, frame lookups, ...), keyed by absIndex
+    Every (type, name) namespace is its own BoundedCache, so large image representations cannot push out
+    small frame lookups. Limits come from namespaceLimits, other namespaces get the default limits.
+    Every namespace has its own lock (even a LRU get() reorders entries), so threads only wait for each other
+    when they touch the same kind of information.
+    """
+
+    defaultMaxEntries: Optional[int] = 1000
+    defaultMaxBytes: Optional[int] = 64 << 20
+    """Limits of the namespaces that have no entry in namespaceLimits"""
+    defaultPolicy = BoundedCache.Policy.LRU
+    namespaceLimits: Dict[Namespace, Tuple[Optional[int], Optional[int]]] = {
+        ("Message", "reprObj"): (MessageAccessor.maxCachedReprObj, 512 << 20),
+        ("Message", "reprDict"): (200, 256 << 20),
+    }
+    """(maxEntries, maxBytes) of a namespace, None means unbounded"""
+
+    def __init__(self):
+        self._namespaces: Dict[Namespace, BoundedCache] = {}
+        self._locks: Dict[Namespace, Lock] = {}
+        self._lock = Lock()  # Only guards creating namespaces
+
+    def namespace(self, type: str, name: str) -> BoundedCache:
+        return self._namespaceAndLock(type, name)[0]
+
+    def _namespaceAndLock(self, type: str, name: str) -> Tuple[BoundedCache, Lock]:
+        key = (type, name)
+        cache = self._namespaces.get(key)
+        if cache is None:
+            with self._lock:
+                cache = self._namespaces.get(key)
+                if cache is None:
+                    maxEntries, maxBytes = self.namespaceLimits.get(
+                        key, (self.defaultMaxEntries, self.defaultMaxBytes)
+                    )
+                    self._locks[key] = Lock()
+                    cache = BoundedCache(maxEntries, maxBytes, self.defaultPolicy)
+                    self._namespaces[key] = cache
+        return cache, self._locks[key]
+
+    def configure(
+        self,
+        type: str,
+        name: str,
+        maxEntries: Optional[int] = None,
+        maxBytes: Optional[int] = None,
+        policy: Optional[BoundedCache.Policy] = None,
+    ) -> None:
+        """Change the limits (and policy) of one namespace, entries over the new limits are evicted right away"""
+        cache, lock = self._namespaceAndLock(type, name)
+        with lock:
+            cache.maxEntries = maxEntries
+            cache.maxBytes = maxBytes
+            if policy is not None:
+                cache.policy = policy
+            cache.evict()
+
+    def get(self, type: str, name: str, absIndex: int) -> Any:
+        cache, lock = self._namespaceAndLock(type, name)
+        with lock:
+            return cache.get(absIndex)
+
+    def put(self, type: str, name: str, absIndex: int, value: Any) -> None:
+        cache, lock = self._namespaceAndLock(type, name)
+        with lock:
+            cache.put(absIndex, value)
+
+    def clear(self) -> None:
+        for key in list(self._namespaces):
+            cache, lock = self._namespaceAndLock(*key)
+            with lock:
+                cache.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Counters of every namespace, keyed "<type>.<name>" """
+        result = {}
+        for type, name in list(self._namespaces):
+            cache, lock = self._namespaceAndLock(type, name)
+            with lock:
+                result[f"{type}.{name}"] = cache.stats()
+        return result
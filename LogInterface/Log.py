@@ -1,21 +1,21 @@
 import csv
 import io
 import os
-from collections import OrderedDict
 from enum import Enum, auto
 from mmap import mmap
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Type, Union
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
+import numpy as np
 from numpy.typing import NDArray
 
-from Primitive.PrimitiveDefinitions import Bool
-from StreamUtils import StreamUtil
+from StreamUtils import BufferCursor, StreamUtil
 from Utils import MemoryMappedFile, isIntAlike
 
 from .Chunk import Chunk, ChunkEnum
 from .DataClasses import DataClass
 from .Frame import FrameAccessor, FrameBase, FrameInstance, Frames
+from .InfoCache import InfoCache
 from .LogInterfaceBase import (
     IndexMap,
     LogInterfaceAccessorClass,
@@ -24,7 +24,9 @@ from .LogInterfaceBase import (
 )
 from .Message import MessageAccessor, MessageBase, MessageInstance, Messages
 from .MessageIDChunk import MessageIDChunk as MChunk
+from .ReprStore import ReprStore
 from .SettingsChunk import SettingsChunk as SChunk
+from .SharedResultBatch import SharedResultBatch
 from .TypeInfoChunk import TypeInfoChunk as TChunk
 from .UncompressedChunk import UncompressedChunk as UChunk
 
@@ -56,6 +58,14 @@ class Log(LogInterfaceInstanceClass):
     1. readLogFile(filePath)
     2. eval(isLogFileLarge=True)
     3. Do something on the parsed data
+
+    Concurrency (large log files, after eval)
+    One Log can be read from many threads, e.g. a ThreadPoolExecutor or the request threads of a server
+    - Accessors are cursors, never share one between threads, use frameHandle()/messageHandle() instead,
+      they are frozen at one absIndex and cheap to create
+    - cacheInfo/getCachedInfo are guarded by one lock per (type, name) namespace, see InfoCache
+    - Index arrays are read only memmaps, reprStore appends under its own lock
+    eval(), parseBytes() and clearIndexFiles() rewrite shared state and must not run concurrently with readers
     """
 
     class EvalInformationFormat(Enum):
@@ -80,8 +90,14 @@ class Log(LogInterfaceInstanceClass):
         self._logFilePath: str
 
         # cache
-        self._messageCachedReprList_cached: NDArray[Bool]
+        self._reprStore_cached: ReprStore
+        self._infoCache_cached: InfoCache
         self._outputDir_cached: Path
+        self._messageIndexArray_cached: Optional[np.memmap]
+        self._frameIndexArray_cached: Optional[np.memmap]
+        self._messageTypeArrays_cached: Dict[str, np.memmap]
+        self._frameTimestamps_cached: Optional[np.memmap]
+        self._pendingReprs_cached: Dict[int, Tuple[SharedResultBatch, int]]
 
     def __getitem__(self, key: Union[int, str, ChunkEnum]) -> Chunk:
         """Allow to use [<chunk idx>/<chunk name>/<chunk enum>] to access a chunk"""
@@ -145,8 +161,9 @@ class Log(LogInterfaceInstanceClass):
 
         self._children = []
 
-        if sutil is None:
-            sutil = StreamUtil(
+        ownSutil = sutil is None
+        if ownSutil:
+            sutil = BufferCursor(
                 self.logBytes, showProgress=True, desc="Evaluating Message Positions"
             )
         startPos = sutil.tell()
@@ -191,6 +208,8 @@ class Log(LogInterfaceInstanceClass):
 
         self._startByte = offset
         self._endByte = sutil.tell() - startPos + offset
+        if ownSutil:
+            sutil.close()
         self.pickleDump()
 
     def parseBytes(self):
@@ -261,21 +280,181 @@ class Log(LogInterfaceInstanceClass):
     def frameDir(self):
         return self.outputDir / f"{Path(self.logFilePath).stem}_frames"
 
+    # Index files
+    @property
+    def messageIndexArray(self) -> NDArray:
+        """messageIndexFile as a structured array (MessageAccessor.messageIdxDtype), mapped once for all accessors"""
+        if getattr(self, "_messageIndexArray_cached", None) is None:
+            self._messageIndexArray_cached = self.mapIndexFile(
+                self.cacheDir / MessageAccessor.messageIdxFileName,
+                MessageAccessor.messageIdxDtype,
+            )
+        return self._messageIndexArray_cached
+
+    @property
+    def frameIndexArray(self) -> NDArray:
+        """frameIndexFile as a structured array (FrameAccessor.frameIdxDtype), mapped once for all accessors"""
+        if getattr(self, "_frameIndexArray_cached", None) is None:
+            self._frameIndexArray_cached = self.mapIndexFile(
+                self.cacheDir / FrameAccessor.frameIdxFileName,
+                FrameAccessor.frameIdxDtype,
+            )
+        return self._frameIndexArray_cached
+
+    def clearIndexArrays(self):
+        """Drop the mapped index arrays, must be called before the index files are written, truncated or removed"""
+        self._messageIndexArray_cached = None
+        self._frameIndexArray_cached = None
+
+    @staticmethod
+    def mapIndexFile(filePath: Path, dtype: np.dtype) -> NDArray:
+        if not filePath.exists():
+            raise OSError(f"Accessor depends on index file, not found: {filePath}")
+        length = filePath.stat().st_size // dtype.itemsize
+        if length == 0:  # mmap cannot map an empty file
+            return np.empty(0, dtype=dtype)
+        return np.memmap(filePath, dtype=dtype, mode="r", shape=(length,))
+
+    def getMessageTypeArray(self, fileName: str) -> NDArray:
+        """Load one of the arrays written by UncompressedChunk.evalMessageTypeIndex(), build them if missing"""
+        if getattr(self, "_messageTypeArrays_cached", None) is None:
+            self._messageTypeArrays_cached = {}
+        if fileName not in self._messageTypeArrays_cached:
+            filePath = self.cacheDir / fileName
+            if not filePath.exists():
+                self.UncompressedChunk.evalMessageTypeIndex()
+            self._messageTypeArrays_cached[fileName] = np.load(filePath, mmap_mode="r")
+        return self._messageTypeArrays_cached[fileName]
+
+    def clearMessageTypeIndex(self):
+        self._messageTypeArrays_cached = None
+
+    @property
+    def messageLogIds(self) -> NDArray:
+        """logId of every message, indexed by absIndex"""
+        return self.getMessageTypeArray(MessageAccessor.messageLogIdFileName)
+
+    @property
+    def messageTypeIndex(self) -> NDArray:
+        """All messages sorted by logId (MessageAccessor.messageTypeIdxDtype), the inverted index of messageLogIds"""
+        return self.getMessageTypeArray(MessageAccessor.messageTypeIdxFileName)
+
+    @property
+    def frameTypeBitmap(self) -> NDArray:
+        """[numFrames, 4] uint64, bit logId is set if the frame contains a message with that logId"""
+        return self.getMessageTypeArray(FrameAccessor.frameTypeBitmapFileName)
+
+    @property
+    def frameTypeOffsets(self) -> NDArray:
+        """[numFrames + 1], start of each frame's entries in frameTypeFirstIndex"""
+        return self.getMessageTypeArray(FrameAccessor.frameTypeOffsetsFileName)
+
+    @property
+    def frameTypeFirstIndex(self) -> NDArray:
+        """Relative index of the first message of each logId in a frame, ordered by frame, then by logId"""
+        return self.getMessageTypeArray(FrameAccessor.frameTypeFirstIndexFileName)
+
+    def messageTypeRecords(
+        self, key: Union[str, Enum], thread: Optional[str] = None
+    ) -> NDArray:
+        """Entries of messageTypeIndex (absIndex, frameIndex) of all messages of a type, optionally of one thread only"""
+        logId = self.MessageIDChunk.getLogId(key)
+        typeIndex = self.messageTypeIndex
+        start, end = np.searchsorted(typeIndex["logId"], [logId, logId + 1])
+        records = typeIndex[start:end]
+        if thread is not None:
+            threadNames = self.frameIndexArray["threadName"][records["frameIndex"]]
+            records = records[threadNames == thread.encode("ascii")]
+        return records
+
+    def readTable(
+        self,
+        key: Union[str, Enum],
+        thread: Optional[str] = None,
+        frames: Optional[IndexMap] = None,
+        timeRange: Optional[Tuple[Optional[int], Optional[int]]] = None,
+    ) -> Dict[str, NDArray]:
+        """Shortcut of UncompressedChunk.readTable()"""
+        return self.UncompressedChunk.readTable(key, thread, frames, timeRange)
+
+    def messagesOfType(
+        self, key: Union[str, Enum], thread: Optional[str] = None
+    ) -> MessageAccessor:
+        """
+        All messages of a type, optionally only the ones logged by a thread
+        key can be a class name ("RobotPose"), an id name ("idRobotPose") or a MessageID member
+        """
+        records = self.messageTypeRecords(key, thread)
+        if len(records) == 0:
+            raise KeyError(
+                f"No message of type {key}"
+                + (f" in thread {thread}" if thread is not None else "")
+            )
+        return self.getMessageAccessor(records["absIndex"].astype(np.int64))
+
+    @property
+    def frameTimestamps(self) -> NDArray:
+        """Monotonic (unwrapped) uint64 timestamp of every frame, see UncompressedChunk.evalTimestamps()"""
+        if getattr(self, "_frameTimestamps_cached", None) is None:
+            filePath = self.cacheDir / FrameAccessor.frameTimestampFileName
+            if not filePath.exists():
+                self.UncompressedChunk.evalTimestamps()
+            self._frameTimestamps_cached = np.load(filePath, mmap_mode="r")
+        return self._frameTimestamps_cached
+
+    def clearFrameTimestamps(self):
+        self._frameTimestamps_cached = None
+
+    def preload(self) -> "Log":
+        """
+        Map every index array and build the derived indexes that are missing
+        Call it before forking workers, they inherit the mappings instead of each building or mapping its own
+        """
+        self.messageIndexArray
+        self.frameIndexArray
+        self.frameTimestamps
+        self.messageTypeIndex
+        self.frameTypeBitmap
+        self.frameTypeOffsets
+        self.frameTypeFirstIndex
+        return self
+
+    # Representation objects
+    @property
+    def reprStore(self) -> ReprStore:
+        """Persistent store of parsed representation objects, see MessageBase.dumpRepr/loadRepr"""
+        if getattr(self, "_reprStore_cached", None) is None:
+            self._reprStore_cached = ReprStore(self.cacheDir / "reprStore")
+        return self._reprStore_cached
+
+    @property
+    def pendingReprs(self) -> Dict[int, Tuple[SharedResultBatch, int]]:
+        """absIndex -> (batch, index in batch), filled by UncompressedChunk.parseBytes(sharedResults=True)"""
+        if getattr(self, "_pendingReprs_cached", None) is None:
+            self._pendingReprs_cached = {}
+        return self._pendingReprs_cached
+
+    def popPendingRepr(self, absIndex: int) -> Optional[DataClass]:
+        """Load the representation object of a message from its shared result batch, None if there is none"""
+        pending = self.pendingReprs.pop(absIndex, None)
+        if pending is None:
+            return None
+        batch, index = pending
+        return batch.load(index)
+
+    # Accessor info cache
+    @property
+    def infoCache(self) -> InfoCache:
+        if getattr(self, "_infoCache_cached", None) is None:
+            self._infoCache_cached = InfoCache()
+        return self._infoCache_cached
+
+    def cacheStats(self) -> Dict[str, Dict[str, int]]:
+        """Entries, estimated bytes, hits, misses and evictions of every info cache namespace"""
+        return self.infoCache.stats()
+
     def writeCacheInfo(self, type, name: str, absIndex: int, value):
-        if not hasattr(self, "_Info_cached") or self._Info_cached is None:
-            self._Info_cached = {}
-        if type not in self._Info_cached:
-            self._Info_cached[type] = {}
-        if name not in self._Info_cached[type]:
-            self._Info_cached[type][name] = OrderedDict({absIndex: value})
-        else:
-            if absIndex not in self._Info_cached[type][name]:
-                self._Info_cached[type][name][absIndex] = value
-            else:
-                self._Info_cached[type][name].pop(absIndex)  # remove the old one
-                self._Info_cached[type][name][absIndex] = [value]
-        if len(self._Info_cached[type][name]) > 100:
-            self._Info_cached[type][name].popitem(last=False)
+        self.infoCache.put(type, name, absIndex, value)
 
     def cacheInfo(self, obj, name: str, value):
         if isinstance(obj, LogInterfaceAccessorClass):
@@ -301,17 +480,7 @@ class Log(LogInterfaceInstanceClass):
                 raise ValueError
         else:
             raise ValueError(f"Unsupported type {obj.__class__.__name__}")
-        absIndex = obj.absIndex
-
-        if not hasattr(self, "_Info_cached") or self._Info_cached is None:
-            self._Info_cached = {}
-        if type not in self._Info_cached:
-            return None
-        if name not in self._Info_cached[type]:
-            return None
-        if absIndex not in self._Info_cached[type][name]:
-            return None
-        return self._Info_cached[type][name][absIndex]
+        return self.infoCache.get(type, name, obj.absIndex)
 
     def getMessageAccessor(
         self, indexMap: Optional[IndexMap] = None
@@ -321,6 +490,18 @@ class Log(LogInterfaceInstanceClass):
     def getFrameAccessor(self, indexMap: Optional[IndexMap] = None) -> FrameAccessor:
         return FrameAccessor(self, indexMap)
 
+    def frameHandle(self, absIndex: int) -> FrameAccessor:
+        """Frame accessor frozen at absIndex, safe to share between threads"""
+        result = self.getFrameAccessor()
+        result.absIndex = absIndex
+        return result.freeze()
+
+    def messageHandle(self, absIndex: int) -> MessageAccessor:
+        """Message accessor frozen at absIndex, safe to share between threads"""
+        result = self.getMessageAccessor()
+        result.absIndex = absIndex
+        return result.freeze()
+
     def getAccessorCopyOf(
         self, source: LogInterfaceBaseClass
     ) -> LogInterfaceAccessorClass:
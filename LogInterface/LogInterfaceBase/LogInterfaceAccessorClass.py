@@ -1,5 +1,4 @@
 import bisect
-import functools
 from abc import abstractmethod
 from mmap import mmap
 from pathlib import Path
@@ -18,6 +17,9 @@ class LogInterfaceAccessorClass(LogInterfaceBaseClass):
     An Iterator Class, mainly used when accessing large log files
     Very light weight, feel free to copy many of it
 
+    An accessor is a cursor: indexing with an int and next() move it in place, so one accessor must not be
+    shared between threads. Iterate (iter() copies) or use frozen handles (Log.frameHandle/messageHandle) instead
+
     All of its functionality is based on log class
     , if you cannot access the log class when instantiate accessor
     , you can also pass in a class that will be in the log
@@ -143,7 +145,7 @@ class LogInterfaceAccessorClass(LogInterfaceBaseClass):
             initialSet = False
 
         if value is None:
-            self._indexMap = range(self.idxFile.getSize() // self.messageIdxByteLength)
+            self._indexMap = range(len(self.indexArray))
         elif len(value) == 0:
             raise ValueError("Empty index map")
         elif isinstance(value, list):
@@ -183,7 +185,6 @@ class LogInterfaceAccessorClass(LogInterfaceBaseClass):
         pass
 
     @staticmethod
-    @functools.lru_cache(maxsize=1000)
     def getBytesFromMmap(idxFile: mmap, indexStart: int, indexEnd: int) -> bytes:
         return idxFile[indexStart:indexEnd]
 
@@ -234,6 +235,21 @@ class LogInterfaceAccessorClass(LogInterfaceBaseClass):
     def indexFilePath(self) -> Path:
         return self.log.cacheDir / self.idxFileName()
 
+    @property
+    @abstractmethod
+    def indexArray(self) -> np.ndarray:
+        """The whole index file as a structured array, shared through the log"""
+        pass
+
+    @property
+    def indexRecords(self) -> np.ndarray:
+        """Index file records of every item in indexMap, in indexMap order"""
+        if isinstance(self.indexMap, range):
+            return self.indexArray[
+                self.indexMap.start : self.indexMap.stop : self.indexMap.step
+            ]
+        return self.indexArray[np.asarray(self.indexMap)]
+
     # index & absIndex
     @property
     def index(self) -> int:
@@ -1,5 +1,4 @@
 import functools
-import json
 from abc import ABC, abstractmethod
 from mmap import mmap
 from pathlib import Path
@@ -8,7 +7,7 @@ from typing import Any, List, Union
 import numpy as np
 
 from StreamUtils import StreamUtil
-from Utils import SpecialEncoder
+from Utils import dumpJson
 
 IndexMap = Union[range, List[int], np.ndarray]
 
@@ -43,7 +42,7 @@ class LogInterfaceBaseClass(ABC):
         return len(self.children)
 
     def __str__(self) -> str:
-        return json.dumps(self.asDict(), indent=self.strIndent, cls=SpecialEncoder)
+        return dumpJson(self.asDict(), indent=self.strIndent)
 
     @property
     @abstractmethod
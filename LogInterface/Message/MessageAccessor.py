@@ -1,4 +1,3 @@
-import os
 from importlib import import_module
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -18,6 +17,25 @@ Messages = Union[List[MessageInstance], "MessageAccessor"]
 
 class MessageAccessor(MessageBase, LogInterfaceAccessorClass):
     messageIdxFileName: str = "messageIndexFile.cache"
+    messageIdxDtype = np.dtype(
+        [
+            ("absIndex", np.uint64),
+            ("frameIndex", np.uint64),
+            ("startByte", np.uint64),
+            ("endByte", np.uint64),
+        ]
+    )
+    """Record layout of messageIndexFile, same bytes as encodeIndexBytes()"""
+    messageLogIdFileName: str = "messageLogIds.npy"
+    messageTypeIdxFileName: str = "messageTypeIndex.npy"
+    messageTypeIdxDtype = np.dtype(
+        [
+            ("logId", np.uint8),
+            ("absIndex", np.uint64),
+            ("frameIndex", np.uint64),
+        ]
+    )
+    """Record layout of messageTypeIndex, all messages sorted by logId, then by absIndex"""
     maxCachedReprObj: int = 200
 
     @staticmethod
@@ -94,35 +112,36 @@ class MessageAccessor(MessageBase, LogInterfaceAccessorClass):
     @property
     def indexFileBytes(self) -> bytes:
         """The bytes of current index in messageIndexFile, which store the location of the message in the log file"""
-        byteIndex = self.absIndex * self.messageIdxByteLength
-        return self.getBytesFromMmap(
-            self.idxFile.getData(), byteIndex, byteIndex + self.messageIdxByteLength
-        )
+        return self.indexArray[self.absIndex].tobytes()
+
+    @property
+    def indexArray(self) -> np.ndarray:
+        return self.log.messageIndexArray
 
     @property
     def messageByteIndex(self) -> Tuple[int, int, int, int]:
         """
         [messageIndex, parentFrameIndex, startByte, endByte]
         """
-        result = self.log.getCachedInfo(self, "messageByteIndex")
-        if result is not None:
-            return result
-
-        result = self.decodeIndexBytes(self.indexFileBytes)
-        self.log.cacheInfo(self, "messageByteIndex", result)
-        return result
+        return self.indexArray[self.absIndex].item()
 
     @property
     def frameIndex(self) -> int:
-        return self.messageByteIndex[1]
+        return int(self.indexArray[self.absIndex]["frameIndex"])
 
     @property
     def startByte(self) -> int:
-        return self.messageByteIndex[2]
+        return int(self.indexArray[self.absIndex]["startByte"])
 
     @property
     def endByte(self) -> int:
-        return self.messageByteIndex[3]
+        return int(self.indexArray[self.absIndex]["endByte"])
+
+    @property
+    def sizes(self) -> np.ndarray:
+        """Size in bytes (header included) of every message in indexMap"""
+        records = self.indexRecords
+        return (records["endByte"] - records["startByte"]).astype(np.int64)
 
     @classmethod
     def validate(cls, idxFile: MemoryMappedFile, absIndex: int, frameIndex: int):
@@ -174,11 +193,6 @@ class MessageAccessor(MessageBase, LogInterfaceAccessorClass):
     def isParsed(self) -> bool:
         return self.log.getCachedInfo(self, "reprObj") is not None
 
-    def hasPickledRepr(self) -> bool:
-        if os.path.isfile(self.reprPicklePath):  # type: ignore
-            return True
-        return False
-
     @property
     def reprDict(self) -> Dict[str, Any]:
         result = self.log.getCachedInfo(self, "reprDict")
@@ -1,19 +1,14 @@
-import functools
-import io
 import os
-import pickle
-import re
 from abc import abstractmethod
 from enum import Enum
-from mmap import ACCESS_READ, mmap
 from pathlib import Path
-from typing import Any, Callable, Dict, Optional, Tuple
+from typing import Any, Dict, Optional
 
 from PIL import PngImagePlugin
 
 from ImageUtils import CameraImage, JPEGImage
 from Primitive import *
-from StreamUtils import StreamUtil
+from StreamUtils import BufferCursor
 from Utils import dumpJson
 
 from ..DataClasses import DataClass
@@ -40,28 +35,16 @@ class MessageBase(LogInterfaceBaseClass):
     # Parse bytes
     def parseBytes(self) -> DataClass:
         """@Override: Parse the message body bytes into a representation object, which hold the information of the message"""
-        if self.loadRepr():
+        pending = self.log.popPendingRepr(self.absIndex)
+        if pending is not None:
+            self.reprObj = pending
+        elif self.loadRepr():
             pass
         else:
-            sutil = StreamUtil(self.logBytes)
-            sutil.seek(self.startByte + 4, io.SEEK_SET)
-
-            self.reprObj = self.classType.read(sutil, self.endByte)
+            with BufferCursor(self.logBytes, self.startByte + 4, sourcePath=self.log.logFilePath) as sutil:
+                self.reprObj = self.classType.read(sutil, self.endByte)
         return self.reprObj
 
-    @staticmethod
-    def parseBytesWrapper(
-        args: Tuple[int, int, Callable], logFilePath: str
-    ) -> DataClass:
-        """This is the wrapper function for parsing bytes with multiprocessing"""
-        start, end, read = args
-        with open(logFilePath, "rb") as logFile, mmap(
-            logFile.fileno(), 0, access=ACCESS_READ
-        ) as buf:
-            buf.seek(start, io.SEEK_SET)
-            reprObj = read(StreamUtil(buf), end)
-        return reprObj
-
     # Derived Properties
     @property
     @abstractmethod
@@ -167,47 +150,22 @@ class MessageBase(LogInterfaceBaseClass):
     def picklePath(self) -> Path:
         return self.log.cacheDir / f"Message_{self.absIndex}.pkl"  # type: ignore
 
-    @property
-    def reprPicklePath(self) -> Path:
-        return self.log.cacheDir / f"Message_{self.absIndex}_repr.pkl"  # type: ignore
-
-    @property
-    @functools.lru_cache(maxsize=1)
-    def reprPicklePathPattern(self) -> re.Pattern:
-        return re.compile(r"^Message_(\d+)_repr\.pkl$")
-
     def dumpRepr(self):
-        os.makedirs(self.picklePath.parent, exist_ok=True)
-        pickle.dump(self.reprObj, open(self.reprPicklePath, "wb"))
-
-    @staticmethod
-    def dumpReprWrapper(picklePath: Path, reprObj: DataClass):
-        with open(picklePath, "wb") as f:
-            pickle.dump(reprObj, f)
+        """Append the representation object to the log's ReprStore"""
+        self.log.reprStore.dump(self.absIndex, self.reprObj)
 
     def loadRepr(self) -> bool:
-        """Load the representation object from the pickle file, returns whether it has been loaded successfully"""
+        """Load the representation object from the log's ReprStore, returns whether it has been loaded successfully"""
         if self.hasPickledRepr():
-            try:
-                self.reprObj = pickle.load(open(self.reprPicklePath, "rb"))
-            except EOFError:
+            result = self.log.reprStore.load(self.absIndex)
+            if result is None:
                 return False
+            self.reprObj = result
             return True
         return False
 
-    @abstractmethod
     def hasPickledRepr(self) -> bool:
-        pass
-
-    @staticmethod
-    def loadReprWrapper(
-        picklePath: Path, index: int
-    ) -> Tuple[Optional[DataClass], int]:
-        try:
-            reprObject = pickle.load(open(picklePath, "rb"))
-            return reprObject, index
-        except EOFError:
-            return None, index
+        return self.absIndex in self.log.reprStore
 
     # Parent
     @property
@@ -252,14 +210,16 @@ class MessageBase(LogInterfaceBaseClass):
         imgName: str,
         metadata=Optional[PngImagePlugin.PngInfo],
         slientFail: bool = False,
+        extractOptions: Optional[Dict[str, Any]] = None,
     ):
+        """extractOptions: arguments of Image.extract() to save a downscaled / grayscale / cropped image"""
         if self.isImage:
             os.makedirs(dir, exist_ok=True)
 
             if isinstance(self.reprObj, CameraImage):
-                self.reprObj.saveImage(os.path.join(dir, imgName), metadata)
+                self.reprObj.saveImage(os.path.join(dir, imgName), metadata, extractOptions=extractOptions)
             elif isinstance(self.reprObj, JPEGImage):
-                self.reprObj.saveImage(os.path.join(dir, imgName), metadata)
+                self.reprObj.saveImage(os.path.join(dir, imgName), metadata, extractOptions=extractOptions)
             else:
                 raise Exception("Not valid image type")
         else:
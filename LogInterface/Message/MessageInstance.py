@@ -1,5 +1,4 @@
 import io
-import os
 from typing import Any, Dict
 
 from Primitive import *
@@ -21,27 +20,6 @@ class MessageInstance(MessageBase, LogInterfaceInstanceClass):
         # cache
         self._reprDict_cached: Dict[str, Any]
 
-    def hasPickledRepr(self) -> bool:
-        if (
-            not hasattr(self.log, "_messageCachedReprList_cached")
-            or self.log._messageCachedReprList_cached is None
-        ):
-            repr_list = os.listdir(self.log.cacheDir)
-            pattern = self.reprPicklePathPattern
-            self.log._messageCachedReprList_cached = np.zeros(
-                len(self.log.messages), dtype=np.bool_
-            )
-            for filename in repr_list:
-                match = pattern.match(filename)
-                if match:
-                    abs_message_index = int(match.group(1))
-                    self.log._messageCachedReprList_cached[abs_message_index] = True
-                    # print(f"Message {abs_message_index} has cached repr")
-        return self.log._messageCachedReprList_cached[self.absIndex]
-        # if os.path.isfile(self.reprPicklePath):  # type: ignore
-        #     return True
-        # return False
-
     def eval(self, sutil: StreamUtil, offset: int = 0):
         """
         Evaluate a message' size, calculate the start and end position in log file
@@ -1,7 +1,7 @@
 import importlib
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Type
+from typing import Dict, List, Type, Union
 
 from StreamUtils import *
 from Utils import sanitizeCName
@@ -20,6 +20,7 @@ class MessageIDChunk(Chunk):
 
         #cache
         self._MessageID_cached: Type[Enum]
+        self._mapClassNameToLog_cached: Dict[str, int]
 
     def eval(self, sutil: StreamUtil, offset: int = 0):
         startPos = sutil.tell()
@@ -63,6 +64,26 @@ class MessageIDChunk(Chunk):
             "mapIDToLog": self.mapIDToLog,
         }
 
+    @property
+    def mapClassNameToLog(self) -> Dict[str, int]:
+        """Maps representation class names (log id names without the "id" prefix) to log IDs"""
+        if not hasattr(self, "_mapClassNameToLog_cached"):
+            self._mapClassNameToLog_cached = {
+                (name[2:] if name.startswith("id") else name): id
+                for id, name in self.logIDNames.items()
+            }
+        return self._mapClassNameToLog_cached
+
+    def getLogId(self, key: Union[str, Enum]) -> int:
+        """Log ID of a message type, given as class name ("RobotPose"), id name ("idRobotPose") or MessageID member"""
+        if isinstance(key, Enum):
+            return self.mapIDToLog[key.value]
+        if key in self.mapClassNameToLog:
+            return self.mapClassNameToLog[key]
+        if key.startswith("id") and key[2:] in self.mapClassNameToLog:
+            return self.mapClassNameToLog[key[2:]]
+        raise KeyError(f"Unknown message type: {key}")
+
     @property
     def providedAttributes(self) -> List[str]:
         return ["logIdNames", "mapNameToID", "mapLogToID", "mapIDToLog"]
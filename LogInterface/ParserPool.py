@@ -0,0 +1,135 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import cpu_count, resource_tracker
+from typing import Dict, Iterator, List, Optional, Type, Union
+
+import numpy as np
+from numpy.typing import NDArray
+
+from StreamUtils import BufferCursor
+from Utils import MemoryMappedFile
+
+from .DataClasses import DataClass
+from .SharedResultBatch import SharedResultBatch, SharedResultHandle
+
+
+class ParserPool:
+    """
+    Persistent process pool that parses message bodies into representation objects
+    Every worker maps the log once in its initializer, tasks are compact arrays of (startByte, endByte, logId)
+    records and every task returns the list of parsed objects of the whole batch
+    With shared=True the objects are not pickled back through the pool, the worker writes them into a shared
+    memory segment and only its handle is returned, see SharedResultBatch
+    """
+
+    taskDtype = np.dtype(
+        [
+            ("startByte", np.uint64),
+            ("endByte", np.uint64),
+            ("logId", np.uint8),
+        ]
+    )
+    """Record layout of one parse task, startByte is the first byte after the message header"""
+    defaultBatchSize: int = 1024
+    """Messages per worker task when batchSize is not given"""
+
+    def __init__(
+        self,
+        logFilePath: str,
+        classTypes: Dict[int, Type[DataClass]],
+        numWorkers: Optional[int] = None,
+        batchSize: Optional[int] = None,
+    ):
+        self.logFilePath = str(logFilePath)
+        self.numWorkers = numWorkers if numWorkers is not None else cpu_count()
+        self.batchSize = batchSize if batchSize is not None else self.defaultBatchSize
+        # Workers must share the tracker of this process, otherwise shared result segments created by a worker
+        # are still tracked by its own tracker after they have been unlinked here
+        resource_tracker.ensure_running()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.numWorkers,
+            initializer=_initWorker,
+            initargs=(self.logFilePath, classTypes),
+        )
+
+    @classmethod
+    def fromLog(
+        cls, log, numWorkers: Optional[int] = None, batchSize: Optional[int] = None
+    ) -> "ParserPool":
+        dataClasses = log.TypeInfoChunk.dataClasses
+        classTypes = {
+            logId: dataClasses[className]
+            for className, logId in log.MessageIDChunk.mapClassNameToLog.items()
+            if className in dataClasses
+        }
+        return cls(log.logFilePath, classTypes, numWorkers, batchSize)
+
+    @classmethod
+    def makeTasks(
+        cls, startBytes: NDArray, endBytes: NDArray, logIds: NDArray
+    ) -> NDArray:
+        """Pack body start, body end and logId of every message into one task array"""
+        tasks = np.empty(len(startBytes), dtype=cls.taskDtype)
+        tasks["startByte"] = startBytes
+        tasks["endByte"] = endBytes
+        tasks["logId"] = logIds
+        return tasks
+
+    def __enter__(self) -> "ParserPool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.shutdown()
+
+    def submit(self, tasks: NDArray, shared: bool = False) -> Future:
+        """
+        Parse one batch in a worker, the future resolves to the parsed objects in task order
+        (or to the SharedResultHandle of the batch if shared)
+        """
+        return self._executor.submit(_parseBatchShared if shared else _parseBatch, tasks)
+
+    def imapBatches(
+        self, tasks: NDArray, shared: bool = False
+    ) -> Iterator[Union[List[DataClass], SharedResultBatch]]:
+        """Parse all tasks in batches of batchSize, yield the results of every batch in task order"""
+        batches = [
+            tasks[start : start + self.batchSize]
+            for start in range(0, len(tasks), self.batchSize)
+        ]
+        if not shared:
+            return self._executor.map(_parseBatch, batches)
+        return map(SharedResultBatch, self._executor.map(_parseBatchShared, batches))
+
+    def parse(self, tasks: NDArray) -> List[DataClass]:
+        result = []
+        for batch in self.imapBatches(tasks):
+            result.extend(batch)
+        return result
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+_workerFile: Optional[MemoryMappedFile] = None
+_workerClassTypes: Dict[int, Type[DataClass]] = {}
+
+
+def _initWorker(logFilePath: str, classTypes: Dict[int, Type[DataClass]]) -> None:
+    """Initializer of ParserPool workers, map the log once for the lifetime of the worker"""
+    global _workerFile, _workerClassTypes
+    _workerFile = MemoryMappedFile(logFilePath)
+    _workerClassTypes = classTypes
+
+
+def _parseBatch(tasks: NDArray) -> List[DataClass]:
+    """Worker of ParserPool, parse every (startByte, endByte, logId) record of the batch"""
+    result = []
+    with BufferCursor(_workerFile.getData(), sourcePath=_workerFile.filename) as sutil:  # type: ignore
+        for startByte, endByte, logId in tasks.tolist():
+            sutil.seek(startByte)
+            result.append(_workerClassTypes[logId].read(sutil, endByte))
+    return result
+
+
+def _parseBatchShared(tasks: NDArray) -> SharedResultHandle:
+    """Worker of ParserPool in shared mode, the parsed batch is handed over in a shared memory segment"""
+    return SharedResultBatch.dump(_parseBatch(tasks))
@@ -0,0 +1,168 @@
+import mmap
+import pickle
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+class ReprStore:
+    """
+    Append-only store of pickled representation objects of one log, replaces the Message_<absIndex>_repr.pkl files
+
+    Pickles are appended to segment files (segment_<n>.bin), every dump appends one (absIndex, segment, offset, length)
+    record per object to the offset table (reprIndex.bin). The table is read once into a dense lookup keyed by
+    absIndex, a later record of the same absIndex wins. Segments are read through mmap.
+    """
+
+    indexDtype = np.dtype(
+        [
+            ("absIndex", np.uint64),
+            ("segment", np.uint32),
+            ("length", np.uint32),
+            ("offset", np.uint64),
+        ]
+    )
+    """Record layout of the offset table"""
+    indexFileName: str = "reprIndex.bin"
+    segmentSize: int = 1 << 30
+    """A new segment file is started once the current one is larger than this"""
+
+    def __init__(self, storeDir: Path):
+        self.storeDir = Path(storeDir)
+        self._lock = Lock()
+        self._mmaps: Dict[int, mmap.mmap] = {}
+        # Dense lookup by absIndex, segment -1 means not stored
+        self._segments: NDArray[np.int64] = np.full(0, -1, dtype=np.int64)
+        self._offsets: NDArray[np.uint64] = np.zeros(0, dtype=np.uint64)
+        self._lengths: NDArray[np.uint32] = np.zeros(0, dtype=np.uint32)
+        self._currentSegment = 0
+        self._readIndex()
+
+    @property
+    def indexFilePath(self) -> Path:
+        return self.storeDir / self.indexFileName
+
+    def segmentPath(self, segment: int) -> Path:
+        return self.storeDir / f"segment_{segment}.bin"
+
+    def _readIndex(self):
+        if not self.indexFilePath.exists():
+            return
+        size = self.indexFilePath.stat().st_size
+        numRecords = size // self.indexDtype.itemsize
+        if size != numRecords * self.indexDtype.itemsize:  # Interrupted dump, drop the partial record
+            with open(self.indexFilePath, "r+b") as indexFile:
+                indexFile.truncate(numRecords * self.indexDtype.itemsize)
+        records = np.fromfile(self.indexFilePath, dtype=self.indexDtype, count=numRecords)
+        if len(records) == 0:
+            return
+        self._currentSegment = int(records["segment"].max())
+        self._updateLookup(records)
+
+    def _updateLookup(self, records: NDArray):
+        absIndexes = records["absIndex"].astype(np.int64)
+        size = int(absIndexes.max()) + 1
+        if size > len(self._segments):
+            grow = size - len(self._segments)
+            self._segments = np.concatenate([self._segments, np.full(grow, -1, dtype=np.int64)])
+            self._offsets = np.concatenate([self._offsets, np.zeros(grow, dtype=np.uint64)])
+            self._lengths = np.concatenate([self._lengths, np.zeros(grow, dtype=np.uint32)])
+        # Fancy assignment keeps the last value of duplicated indexes, so newer records win
+        self._segments[absIndexes] = records["segment"]
+        self._offsets[absIndexes] = records["offset"]
+        self._lengths[absIndexes] = records["length"]
+
+    def __contains__(self, absIndex: int) -> bool:
+        return 0 <= absIndex < len(self._segments) and self._segments[absIndex] >= 0
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._segments >= 0))
+
+    # Write
+    def dump(self, absIndex: int, obj: Any):
+        self.dumpMany([absIndex], [obj])
+
+    def dumpMany(self, absIndexes: Iterable[int], objects: Iterable[Any]):
+        """Append all objects with one write to the segment and one write to the offset table"""
+        streams = [pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL) for obj in objects]
+        absIndexes = list(absIndexes)
+        if len(streams) != len(absIndexes):
+            raise ValueError("Number of objects does not match number of indexes")
+        if not streams:
+            return
+        with self._lock:
+            self.storeDir.mkdir(parents=True, exist_ok=True)
+            segmentPath = self.segmentPath(self._currentSegment)
+            if segmentPath.exists() and segmentPath.stat().st_size >= self.segmentSize:
+                self._currentSegment += 1
+                segmentPath = self.segmentPath(self._currentSegment)
+            start = segmentPath.stat().st_size if segmentPath.exists() else 0
+
+            records = np.empty(len(streams), dtype=self.indexDtype)
+            records["absIndex"] = absIndexes
+            records["segment"] = self._currentSegment
+            lengths = np.array([len(stream) for stream in streams], dtype=np.uint64)
+            records["length"] = lengths
+            records["offset"] = start + np.cumsum(lengths) - lengths
+
+            with open(segmentPath, "ab") as segmentFile:
+                segmentFile.write(b"".join(streams))
+            with open(self.indexFilePath, "ab") as indexFile:  # After the data, so a record never points to nothing
+                indexFile.write(records.tobytes())
+            self._updateLookup(records)
+
+    # Read
+    def _segmentData(self, segment: int, end: int) -> mmap.mmap:
+        """Mapping of a segment that covers at least [0, end), remapped when the segment has grown"""
+        mapping = self._mmaps.get(segment)
+        if mapping is None or len(mapping) < end:
+            with open(self.segmentPath(segment), "rb") as segmentFile:
+                mapping = mmap.mmap(segmentFile.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mmaps[segment] = mapping  # The old mapping is closed once it is garbage collected
+        return mapping
+
+    def load(self, absIndex: int) -> Optional[Any]:
+        """The stored object of a message, None if it is not stored or cannot be read"""
+        if absIndex not in self:
+            return None
+        segment = int(self._segments[absIndex])
+        offset = int(self._offsets[absIndex])
+        end = offset + int(self._lengths[absIndex])
+        try:
+            with self._lock:
+                mapping = self._segmentData(segment, end)
+            return pickle.loads(mapping[offset:end])
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def loadMany(self, absIndexes: Iterable[int]) -> List[Optional[Any]]:
+        """Load in (segment, offset) order so the segments are read sequentially, results keep the given order"""
+        absIndexes = list(absIndexes)
+        order = sorted(
+            range(len(absIndexes)),
+            key=lambda i: (
+                (int(self._segments[absIndexes[i]]), int(self._offsets[absIndexes[i]]))
+                if absIndexes[i] in self
+                else (-1, 0)
+            ),
+        )
+        result: List[Optional[Any]] = [None] * len(absIndexes)
+        for i in order:
+            result[i] = self.load(absIndexes[i])
+        return result
+
+    def clear(self):
+        """Remove all stored objects"""
+        with self._lock:
+            self._mmaps = {}
+            self._segments = np.full(0, -1, dtype=np.int64)
+            self._offsets = np.zeros(0, dtype=np.uint64)
+            self._lengths = np.zeros(0, dtype=np.uint32)
+            self._currentSegment = 0
+            if self.storeDir.exists():
+                for path in self.storeDir.glob("segment_*.bin"):
+                    path.unlink()
+                self.indexFilePath.unlink(missing_ok=True)
@@ -0,0 +1,96 @@
+import pickle
+from multiprocessing import shared_memory
+from typing import Any, List, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+SharedResultHandle = Tuple[str, NDArray, NDArray]
+"""(segment name, object table, buffer table), the only thing sent back by a ParserPool worker in shared mode"""
+
+
+class SharedResultBatch:
+    """
+    Parsed objects of one ParserPool batch, stored in a multiprocessing.shared_memory segment
+
+    The worker pickles every object with protocol 5, large buffers (numpy arrays, e.g. CameraImage.image) are
+    taken out-of-band and written next to the pickle stream instead of being copied into it.
+    The parent only receives the segment name and two small offset tables, an object is unpickled the first
+    time load() is asked for it, its buffers are copied out once so nothing keeps the segment exported.
+    The segment is unlinked as soon as the parent attaches, it is closed when every object has been loaded.
+    """
+
+    @staticmethod
+    def dump(objects: List[Any]) -> SharedResultHandle:
+        """Worker side, write objects into a new segment and return its handle"""
+        streams: List[bytes] = []
+        buffers: List[List[memoryview]] = []
+        for obj in objects:
+            objectBuffers: List[pickle.PickleBuffer] = []
+            streams.append(
+                pickle.dumps(obj, protocol=5, buffer_callback=objectBuffers.append)
+            )
+            buffers.append([buffer.raw() for buffer in objectBuffers])
+
+        # (stream offset, stream length, first buffer, number of buffers) of every object
+        objectTable = np.empty((len(objects), 4), dtype=np.int64)
+        # (buffer offset, buffer length) of every out-of-band buffer
+        bufferTable = np.empty((sum(len(b) for b in buffers), 2), dtype=np.int64)
+        offset = 0
+        bufferIndex = 0
+        for index, (stream, objectBuffers) in enumerate(zip(streams, buffers)):
+            objectTable[index] = (offset, len(stream), bufferIndex, len(objectBuffers))
+            offset += len(stream)
+            for buffer in objectBuffers:
+                bufferTable[bufferIndex] = (offset, buffer.nbytes)
+                offset += buffer.nbytes
+                bufferIndex += 1
+
+        segment = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        try:
+            for index, (stream, objectBuffers) in enumerate(zip(streams, buffers)):
+                start, length, firstBuffer, _ = objectTable[index].tolist()
+                segment.buf[start : start + length] = stream
+                for bufferIndex, buffer in enumerate(objectBuffers, firstBuffer):
+                    start, length = bufferTable[bufferIndex].tolist()
+                    segment.buf[start : start + length] = buffer
+            return segment.name, objectTable, bufferTable
+        finally:
+            segment.close()  # Only the worker's mapping, the parent unlinks it
+
+    def __init__(self, handle: SharedResultHandle):
+        name, self.objectTable, self.bufferTable = handle
+        self._segment = shared_memory.SharedMemory(name)
+        self._segment.unlink()  # The mapping stays valid, the memory is freed once it is closed
+        self._numPending = len(self.objectTable)
+        if self._numPending == 0:
+            self.release()
+
+    def __len__(self) -> int:
+        return len(self.objectTable)
+
+    def load(self, index: int) -> Any:
+        """Unpickle the index-th object of the batch, every object should be loaded only once"""
+        if self._segment is None:
+            raise ValueError("Shared result batch already released")
+        start, length, firstBuffer, numBuffers = self.objectTable[index].tolist()
+        buf = self._segment.buf
+        buffers = [
+            bytearray(buf[bufferStart : bufferStart + bufferLength])
+            for bufferStart, bufferLength in self.bufferTable[
+                firstBuffer : firstBuffer + numBuffers
+            ].tolist()
+        ]
+        result = pickle.loads(buf[start : start + length], buffers=buffers)
+        self._numPending -= 1
+        if self._numPending == 0:
+            self.release()
+        return result
+
+    def loadAll(self) -> List[Any]:
+        return [self.load(index) for index in range(len(self))]
+
+    def release(self) -> None:
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
@@ -18,6 +18,16 @@ from .DataClasses import (Annotation, DataClass, FrameBegin, FrameFinished,
 
 
 class TypeInfoChunk(Chunk):
+    customReadClasses: List[str] = [
+        "Annotation",
+        "Stopwatch",
+        "FrameBegin",
+        "FrameFinished",
+        "CameraImage",
+        "JPEGImage",
+    ]
+    """Classes read by hand written code, never part of a fixed layout"""
+
     def __init__(self, parent):
         super().__init__(parent)
 
@@ -62,6 +72,68 @@ class TypeInfoChunk(Chunk):
         with open(Path(__file__).parent / "LogClasses" / "LogEnum.py", "w") as f:
             f.write(enumString)
 
+    # Fixed layouts
+    def fieldDtype(self, ctype: str, fixedClasses: Dict[str, bool]) -> Optional[str]:
+        """Code of the NumPy dtype of a single (non-array) field, None if its size is not fixed"""
+        if ctype in self.primitives:
+            if ctype == "std::string":
+                return None
+            return "Float" if ctype == "Angle" else parseCtype2Pytype(ctype)
+        elif ctype in self.enumDescriptions:
+            return "UChar"
+        elif ctype in self.dataClassDescriptions and self.isFixedClass(
+            ctype, fixedClasses
+        ):
+            return f"{sanitizeCName(ctype)}.fixedDtype"
+        return None
+
+    def fieldDtypeTuple(
+        self, attrName: str, attrCtype: str, fixedClasses: Dict[str, bool]
+    ) -> Optional[str]:
+        """Code of the (name, dtype[, shape]) tuple of a field in a structured dtype, None if its size is not fixed"""
+        ctype, length = type2ReadInstruction(attrCtype)
+        dtype = self.fieldDtype(ctype, fixedClasses)
+        if dtype is None or length == -1:
+            return None
+        if length == 1:
+            return f'("{attrName}", {dtype})'
+        return f'("{attrName}", {dtype}, ({length},))'
+
+    def isFixedClass(self, className: str, fixedClasses: Dict[str, bool]) -> bool:
+        """Whether all fields of a class (transitively) have a fixed size, results are memoized in fixedClasses in dependency order"""
+        if className not in fixedClasses:
+            fixedClasses[className] = False  # Guard against recursive types
+            dataClass = self.dataClassDescriptions[className]
+            isFixed = (
+                className not in self.customReadClasses
+                and len(dataClass) > 0
+                and all(
+                    self.fieldDtypeTuple(sanitizeCName(attrName), attrCtype, fixedClasses)
+                    is not None
+                    for attrName, attrCtype in dataClass
+                )
+            )
+            del fixedClasses[className]  # Re-insert after all the classes it depends on
+            fixedClasses[className] = isFixed
+        return fixedClasses[className]
+
+    def fieldFromRecord(self, attrName: str, attrCtype: str, record: str) -> str:
+        """Code that converts a field of a record (read with the fixed dtype) to the value the normal read would produce"""
+        ctype, length = type2ReadInstruction(attrCtype)
+        pytype = parseCtype2Pytype(ctype)
+        value = f'{record}["{attrName}"]'
+        if ctype in self.primitives:
+            if ctype != "Angle":
+                return value
+            convert = "Angle({})"
+        elif ctype in self.enumDescriptions:
+            convert = pytype + "({})"
+        else:
+            convert = pytype + ".fromRecord({})"
+        if length == 1:
+            return convert.format(value)
+        return f"[{convert.format('attrValue')} for attrValue in {value}]"
+
     def dumpLogClass(self, source=Optional[str]):
         codeLines = []
         codeLines.append(
@@ -71,12 +143,15 @@ class TypeInfoChunk(Chunk):
             f'"""Generated from log file: {self.logFilePath if source is None else source}"""'
         )
         codeLines.append("from typing import List, Dict")
+        codeLines.append("import numpy as np")
         codeLines.append("from ..DataClasses import DataClass")
         codeLines.append("from .LogEnum import *")
         codeLines.append("from Primitive import *")
         codeLines.append("from StreamUtils import *")
 
         selfDefinedClasses = ["Annotation", "Stopwatch", "FrameBegin", "FrameFinished"]
+        fixedClasses: Dict[str, bool] = {}
+        segmentDtypes: Dict[str, List[List[str]]] = {}
         for className, dataClass in self.dataClassDescriptions.items():
             if className in selfDefinedClasses:
                 continue
@@ -123,12 +198,45 @@ class TypeInfoChunk(Chunk):
             )
             codeLines.extend(asDictFunction)
 
+            if self.isFixedClass(className, fixedClasses):
+                # The whole message is a single record of fixedDtype
+                fromRecordFunction = [
+                    "\t@classmethod",
+                    f'\tdef fromRecord(cls, record) -> "{sanitizeCName(className)}":',
+                    "\t\tinstance = cls()",
+                ] + [
+                    f"\t\tinstance.{attrName} = {self.fieldFromRecord(attrName, attributeCtype[attrName], 'record')}"
+                    for attrName in readOrder
+                ]
+                fromRecordFunction.append("\t\treturn instance")
+                codeLines.extend(fromRecordFunction)
+
             readFunction = [
                 "\t@classmethod",
                 f'\tdef read(cls, sutil: StreamUtil, end: int = -1) -> "{sanitizeCName(className)}":',
-                "\t\tinstance = cls()",
             ]
+            if self.isFixedClass(className, fixedClasses):
+                readOrder = []
+                readFunction.append(
+                    "\t\tinstance = cls.fromRecord(sutil.readRecord(cls.fixedDtype))"
+                )
+            else:
+                readFunction.append("\t\tinstance = cls()")
+                readOrder, segmentLines = self.coalesceFixedFields(
+                    readOrder, attributeCtype, fixedClasses
+                )
+                if segmentLines:
+                    segmentDtypes[className] = segmentLines
             for attrName in readOrder:
+                if isinstance(attrName, int):  # Index of a segment of consecutive fixed size fields
+                    readFunction.append(
+                        f"\t\trecord = sutil.readRecord(cls.segmentDtypes[{attrName}])"
+                    )
+                    readFunction.extend(
+                        f"\t\tinstance.{segmentAttrName} = {self.fieldFromRecord(segmentAttrName, attributeCtype[segmentAttrName], 'record')}"
+                        for segmentAttrName in segmentDtypes[className][attrName]
+                    )
+                    continue
                 ctype, length = type2ReadInstruction(attributeCtype[attrName])
                 pytype = parseCtype2Pytype(ctype)
                 if ctype in self.primitives:
@@ -159,10 +267,64 @@ class TypeInfoChunk(Chunk):
             )
             codeLines.extend(readFunction)
 
+        # fixedClasses is filled in dependency order, so nested dtypes are always defined first
+        for className, isFixed in fixedClasses.items():
+            if not isFixed:
+                continue
+            fields = [
+                self.fieldDtypeTuple(sanitizeCName(attrName), attrCtype, fixedClasses)
+                for attrName, attrCtype in self.dataClassDescriptions[className]
+            ]
+            codeLines.append(
+                f"{sanitizeCName(className)}.fixedDtype = np.dtype([{', '.join(fields)}])"  # type: ignore
+            )
+        for className, segments in segmentDtypes.items():
+            attributeCtype = {
+                sanitizeCName(attrName): attrCtype
+                for attrName, attrCtype in self.dataClassDescriptions[className]
+            }
+            segmentCodes = [
+                f"np.dtype([{', '.join(self.fieldDtypeTuple(attrName, attributeCtype[attrName], fixedClasses) for attrName in segment)}])"  # type: ignore
+                for segment in segments
+            ]
+            codeLines.append(
+                f"{sanitizeCName(className)}.segmentDtypes = [{', '.join(segmentCodes)}]"
+            )
+
         classString = "\n".join(codeLines)
         with open(Path(__file__).parent / "LogClasses" / "LogClass.py", "w") as f:
             f.write(classString)
 
+    def coalesceFixedFields(
+        self,
+        readOrder: List[str],
+        attributeCtype: Dict[str, str],
+        fixedClasses: Dict[str, bool],
+    ) -> Tuple[List, List[List[str]]]:
+        """
+        Group runs of at least two consecutive fixed size fields of a variable size class into segments read as one record
+        Returns the read order with each run replaced by its segment index, and the attribute names of each segment
+        """
+        result = []
+        segments: List[List[str]] = []
+        run: List[str] = []
+        for attrName in readOrder + [None]:
+            if attrName is not None and (
+                self.fieldDtypeTuple(attrName, attributeCtype[attrName], fixedClasses)
+                is not None
+            ):
+                run.append(attrName)
+                continue
+            if len(run) > 1:
+                result.append(len(segments))
+                segments.append(run)
+            else:
+                result.extend(run)
+            run = []
+            if attrName is not None:
+                result.append(attrName)
+        return result, segments
+
     def registerDataClasses(self):
         self._dataClasses = {}
         LogClass = importlib.import_module(".LogClasses.LogClass", "LogInterface")
@@ -1,30 +1,29 @@
-import asyncio
 import csv
-import functools
 import os
-import threading
-import queue
-import time
 from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future
+from enum import Enum, auto
 from functools import partial
-from multiprocessing import Pool, cpu_count
+from multiprocessing import cpu_count
 from pathlib import Path
-from threading import Lock, Thread
-from typing import Dict, List, Optional, Set
+from threading import Lock
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 import numpy as np
 from tqdm import tqdm
 
 from Primitive.PrimitiveDefinitions import UChar
-from StreamUtils import AbsoluteByteIndex, StreamUtil, SutilCursor
-from Utils import MemoryMappedFile
+from StreamUtils import (AbsoluteByteIndex, BufferCursor, StreamUtil,
+                         SutilCursor)
+from Utils import MemoryMappedFile, flattenDataClass, flattenStructuredArray
 
 from .Chunk import Chunk, ChunkEnum
 from .DataClasses import DataClass, Stopwatch, Timer
 from .Frame import FrameAccessor, FrameBase, FrameInstance, Frames
+from .IndexScanner import IndexScanner
 from .LogInterfaceBase import IndexMap, LogInterfaceAccessorClass
 from .Message import MessageAccessor, MessageBase, MessageInstance, Messages
+from .ParserPool import ParserPool
 
 
 class UncompressedChunk(Chunk):
@@ -33,6 +32,21 @@ class UncompressedChunk(Chunk):
     It contains list of Frames
     """
 
+    class ScanMode(Enum):
+        SEQUENTIAL = 0
+        """Eval every frame and message with FrameInstance/MessageInstance"""
+        VECTORIZED = auto()
+        """Walk message headers in batches and build the index records with NumPy, see IndexScanner"""
+        SHARDED = auto()
+        """Split the chunk at frame boundaries and scan the parts in parallel processes, see IndexScanner.scanSharded"""
+
+    scanMode = ScanMode.VECTORIZED
+    """How eval() builds the message index, see ScanMode"""
+    numIndexWorkers = cpu_count()
+    """Processes of ScanMode.SHARDED"""
+    reprDumpBatchSize = 4096
+    """Representation objects appended to the ReprStore per call"""
+
     def __init__(self, parent):
         super().__init__(parent)
         self._threads: Dict[str, Frames] = {}
@@ -41,17 +55,16 @@ class UncompressedChunk(Chunk):
         # cached index of messages and data objects
         self._messagesCached: Messages
 
-        self._resultQueue_cached = queue.Queue(maxsize=1000)  # Add bounded queue
-        self._executor: ThreadPoolExecutor
+        # background parsing
+        self._parserPool_cached: Optional[ParserPool] = None
         self._lock: Lock = Lock()
         self._activeFutures: Set = set()
-        self._shutdown: bool = False
 
-    def _initExecutor(self):
-        self._executor = ThreadPoolExecutor(max_workers=cpu_count())
-        self._processorThread = Thread(target=self._processResults)
-        self._processorThread.daemon = True
-        self._processorThread.start()
+    def _initExecutor(self) -> ParserPool:
+        with self._lock:
+            if getattr(self, "_parserPool_cached", None) is None:
+                self._parserPool_cached = ParserPool.fromLog(self.log)
+            return self._parserPool_cached
 
     @property
     def frames(self) -> Frames:
@@ -66,6 +79,9 @@ class UncompressedChunk(Chunk):
             self.log.cacheDir / MessageAccessor.messageIdxFileName
         )
         frameIdxFilePath: Path = self.log.cacheDir / FrameAccessor.frameIdxFileName
+        self.log.clearIndexArrays()
+        self.log.clearMessageTypeIndex()
+        self.log.clearFrameTimestamps()
         if messageIdxFilePath.exists():
             messageIdxFilePath.unlink()
         if frameIdxFilePath.exists():
@@ -121,10 +137,246 @@ class UncompressedChunk(Chunk):
         except OSError:
             pass
 
-        messageIdxFile = open(messageIdxFilePath, "ab")
-        frameIdxFile = open(frameIdxFilePath, "ab")
+        self.log.clearIndexArrays()
+        with open(messageIdxFilePath, "ab") as messageIdxFile, open(
+            frameIdxFilePath, "ab"
+        ) as frameIdxFile:
+            if self.scanMode == UncompressedChunk.ScanMode.VECTORIZED:
+                scanner = IndexScanner.fromLog(self.log)
+                scanner.scan(
+                    byteIndex + messageStartByte,
+                    min(usedSize, remainingSize) + messageStartByte,
+                    frameCnt,
+                    messageCnt,
+                    messageIdxFile,
+                    frameIdxFile,
+                    sutil,
+                )
+                del scanner  # Release its view on the log bytes
+            elif self.scanMode == UncompressedChunk.ScanMode.SHARDED:
+                scanner = IndexScanner.fromLog(self.log)
+                scanner.scanSharded(
+                    byteIndex + messageStartByte,
+                    min(usedSize, remainingSize) + messageStartByte,
+                    frameCnt,
+                    messageCnt,
+                    messageIdxFile,
+                    frameIdxFile,
+                    self.log.logFilePath,
+                    self.log.cacheDir,
+                    self.numIndexWorkers,
+                    sutil,
+                )
+                del scanner
+            else:
+                self._evalIndexSequentially(
+                    sutil,
+                    byteIndex,
+                    messageStartByte,
+                    min(usedSize, remainingSize),
+                    frameCnt,
+                    messageCnt,
+                    messageIdxFile,
+                    frameIdxFile,
+                )
 
-        while byteIndex < min(usedSize, remainingSize):
+        self.log.clearIndexArrays()
+        self.frames = self.log.getFrameAccessor()
+        for threadName, indexes in self._buildThreadIndexMaps(
+            self.log.frameIndexArray["threadName"]
+        ).items():
+            self._threads[threadName] = FrameAccessor(self.log, indexes)
+        self.evalMessageTypeIndex()
+        self.evalTimestamps()
+        self._startByte = offset
+        self._endByte = sutil.tell() - startPos + offset
+
+    def evalMessageTypeIndex(self):
+        """
+        Write the logId of every message and an inverted index (messages sorted by logId) next to the index files
+        Used by Log.messagesOfType() to jump to all messages of a type without touching the other messages
+        Also writes the per frame lookup tables used by FrameAccessor.messageRelIndex()
+        """
+        messageIndexArray = self.log.messageIndexArray
+        logBytes = np.frombuffer(self.log.logBytes, dtype=np.uint8)
+        logIds = logBytes[messageIndexArray["startByte"].astype(np.int64)]
+        del logBytes  # Release the view on the log bytes
+        frameIndexes = messageIndexArray["frameIndex"].astype(np.int64)
+
+        order = np.argsort(logIds, kind="stable")
+        typeIndex = np.empty(len(order), dtype=MessageAccessor.messageTypeIdxDtype)
+        typeIndex["logId"] = logIds[order]
+        typeIndex["absIndex"] = order
+        typeIndex["frameIndex"] = frameIndexes[order]
+
+        # First message of every (frame, logId) pair, ordered by frame, then by logId
+        numFrames = len(self.log.frameIndexArray)
+        keys, firstMessage = np.unique(
+            frameIndexes * 256 + logIds, return_index=True
+        )
+        keyFrames = keys >> 8
+        keyLogIds = keys & 0xFF
+        bitmap = np.zeros((numFrames, 4), dtype=np.uint64)
+        np.add.at(
+            bitmap,
+            (keyFrames, keyLogIds >> 6),
+            np.left_shift(np.uint64(1), (keyLogIds & 63).astype(np.uint64)),
+        )  # Every (frame, logId) pair is unique, so adding never carries
+        offsets = np.searchsorted(keyFrames, np.arange(numFrames + 1)).astype(np.int64)
+        firstIndex = (
+            firstMessage
+            - self.log.frameIndexArray["msgStart"].astype(np.int64)[keyFrames]
+        ).astype(np.uint32)
+
+        self.log.clearMessageTypeIndex()
+        cacheDir = self.log.cacheDir
+        np.save(cacheDir / MessageAccessor.messageLogIdFileName, logIds)
+        np.save(cacheDir / MessageAccessor.messageTypeIdxFileName, typeIndex)
+        np.save(cacheDir / FrameAccessor.frameTypeBitmapFileName, bitmap)
+        np.save(cacheDir / FrameAccessor.frameTypeOffsetsFileName, offsets)
+        np.save(cacheDir / FrameAccessor.frameTypeFirstIndexFileName, firstIndex)
+
+    def evalTimestamps(self):
+        """
+        Write the timestamp of every frame next to the index files
+        FrameInfo.time is gathered directly from the log bytes through the type index, frames without FrameInfo are
+        interpolated from their neighbours and wraparounds of the 32 bit clock are unwrapped, so the column is monotonic
+        """
+        numFrames = len(self.log.frameIndexArray)
+        timestamps = np.arange(numFrames, dtype=np.uint64)  # No FrameInfo at all, frame index is used instead
+
+        typeIndex = self.log.messageTypeIndex
+        logId = self.log.MessageIDChunk.mapClassNameToLog.get("FrameInfo")
+        start, end = np.searchsorted(
+            typeIndex["logId"], [logId, logId + 1] if logId is not None else [0, 0]
+        )
+        # typeIndex is sorted by absIndex within a type, so the first FrameInfo of each frame comes first
+        frames, first = np.unique(
+            typeIndex["frameIndex"][start:end].astype(np.int64), return_index=True
+        )
+        messageRecords = self.log.messageIndexArray[
+            typeIndex["absIndex"][start:end][first].astype(np.int64)
+        ]
+        startBytes = messageRecords["startByte"].astype(np.int64)
+        hasTime = messageRecords["endByte"].astype(np.int64) - startBytes >= 8
+        frames = frames[hasTime]
+        startBytes = startBytes[hasTime]
+
+        if len(frames):
+            logBytes = np.frombuffer(self.log.logBytes, dtype=np.uint8)
+            times = (
+                logBytes[(startBytes + 4)[:, None] + np.arange(4)]
+                .copy()
+                .view("<u4")
+                .ravel()
+                .astype(np.int64)
+            )
+            del logBytes  # Release the view on the log bytes
+            wraps = np.concatenate(([0], np.cumsum(np.diff(times) < -(1 << 31))))
+            times += wraps << 32
+            timestamps = self.interpolateTimestamps(frames, times, numFrames)
+
+        self.log.clearFrameTimestamps()
+        np.save(self.log.cacheDir / FrameAccessor.frameTimestampFileName, timestamps)
+
+    @staticmethod
+    def interpolateTimestamps(
+        frames: np.ndarray, times: np.ndarray, numFrames: int
+    ) -> np.ndarray:
+        """Linear interpolation between known timestamps, frames before the first or after the last one step by 1 per frame"""
+        allFrames = np.arange(numFrames, dtype=np.int64)
+        result = np.interp(allFrames, frames, times).astype(np.int64)
+        leading = allFrames < frames[0]
+        result[leading] = times[0] - (frames[0] - allFrames[leading])
+        trailing = allFrames > frames[-1]
+        result[trailing] = times[-1] + (allFrames[trailing] - frames[-1])
+        return np.maximum(result, 0).astype(np.uint64)
+
+    def readTable(
+        self,
+        key: Union[str, Enum],
+        thread: Optional[str] = None,
+        frames: Optional[IndexMap] = None,
+        timeRange: Optional[Tuple[Optional[int], Optional[int]]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Decode all messages of a representation type into columns {dotted attribute name: array}
+        Messages can be filtered by thread, frame indexes and a [start, end] range of Log.frameTimestamps
+        Fixed size classes are decoded straight from the log bytes with their fixedDtype, others are parsed one by one
+        Extra columns: _absIndex, _frameIndex, _timestamp
+        """
+        log = self.log
+        records = log.messageTypeRecords(key, thread)
+        frameIndexes = records["frameIndex"].astype(np.int64)
+        timestamps = np.asarray(log.frameTimestamps)[frameIndexes]
+        keep = np.ones(len(records), dtype=np.bool_)
+        if frames is not None:
+            keep &= np.isin(frameIndexes, np.asarray(frames, dtype=np.int64))
+        if timeRange is not None:
+            startTime, endTime = timeRange
+            if startTime is not None:
+                keep &= timestamps >= startTime
+            if endTime is not None:
+                keep &= timestamps <= endTime
+        absIndexes = records["absIndex"][keep].astype(np.int64)
+        frameIndexes = frameIndexes[keep]
+        timestamps = timestamps[keep]
+
+        messageRecords = log.messageIndexArray[absIndexes]
+        bodyStarts = messageRecords["startByte"].astype(np.int64) + 4
+        bodyEnds = messageRecords["endByte"].astype(np.int64)
+
+        className = log.MessageIDChunk.logIDNames[log.MessageIDChunk.getLogId(key)]
+        className = className[2:] if className.startswith("id") else className
+        classType = log.TypeInfoChunk.dataClasses[className]
+        fixedDtype = getattr(classType, "fixedDtype", None)
+        if fixedDtype is not None and np.all(bodyEnds - bodyStarts == fixedDtype.itemsize):
+            columns = flattenStructuredArray(
+                self.gatherBytes(bodyStarts, fixedDtype.itemsize).reshape(-1).view(fixedDtype)
+            )
+        else:
+            rows = []
+            with BufferCursor(log.logBytes, sourcePath=log.logFilePath) as sutil:
+                for start, end in zip(bodyStarts.tolist(), bodyEnds.tolist()):
+                    sutil.seek(start)
+                    rows.append(flattenDataClass(classType.read(sutil, end)))
+            names: Dict[str, None] = {}
+            for row in rows:
+                names.update(dict.fromkeys(row))
+            columns = {
+                name: np.array([row.get(name) for row in rows]) for name in names
+            }
+
+        columns["_absIndex"] = absIndexes
+        columns["_frameIndex"] = frameIndexes
+        columns["_timestamp"] = timestamps
+        return columns
+
+    def gatherBytes(self, starts: np.ndarray, size: int) -> np.ndarray:
+        """[len(starts), size] uint8 array of the log bytes starting at each position, gathered in batches"""
+        logBytes = np.frombuffer(self.log.logBytes, dtype=np.uint8)
+        result = np.empty((len(starts), size), dtype=np.uint8)
+        batchSize = max(1, (1 << 24) // max(size, 1))
+        offsets = np.arange(size)
+        for batchStart in range(0, len(starts), batchSize):
+            batch = starts[batchStart : batchStart + batchSize]
+            result[batchStart : batchStart + len(batch)] = logBytes[batch[:, None] + offsets]
+        del logBytes  # Release the view on the log bytes
+        return result
+
+    def _evalIndexSequentially(
+        self,
+        sutil: StreamUtil,
+        byteIndex: int,
+        messageStartByte: int,
+        limit: int,
+        frameCnt: int,
+        messageCnt: int,
+        messageIdxFile,
+        frameIdxFile,
+    ):
+        """Index frames one by one with FrameInstance.eval, ScanMode.SEQUENTIAL"""
+        while byteIndex < limit:
             frame = FrameInstance(self)
             try:
                 frame.eval(sutil, byteIndex + messageStartByte)
@@ -156,22 +408,19 @@ class UncompressedChunk(Chunk):
 
             byteIndex += frame.size
             frameCnt += 1
-        self.frames = self.log.getFrameAccessor()
-        threadIndexMaps = {}
 
-        for index, frame in enumerate(self.frames):
-            if frame.threadName not in threadIndexMaps:
-                threadIndexMaps[frame.threadName] = [index]
-            else:
-                threadIndexMaps[frame.threadName].append(index)
-        for threadName, indexes in threadIndexMaps.items():
-            threadIndexMaps[frame.threadName] = np.array(
-                threadIndexMaps[frame.threadName]
+    @staticmethod
+    def _buildThreadIndexMaps(threadNames: np.ndarray) -> Dict[str, np.ndarray]:
+        """Group frame indexes by thread name, in order of the first appearance of each thread"""
+        names, firstIndex, inverse = np.unique(
+            threadNames, return_index=True, return_inverse=True
+        )
+        threadIndexMaps = {}
+        for nameIdx in np.argsort(firstIndex):
+            threadIndexMaps[names[nameIdx].decode("ascii")] = np.flatnonzero(
+                inverse == nameIdx
             )
-        for threadName, indexes in threadIndexMaps.items():
-            self._threads[threadName] = FrameAccessor(self.log, indexes)
-        self._startByte = offset
-        self._endByte = sutil.tell() - startPos + offset
+        return threadIndexMaps
 
     def evalFrameAndMessageInstances(self, sutil: StreamUtil, offset: int = 0):
         """
@@ -232,15 +481,20 @@ class UncompressedChunk(Chunk):
         else:
             self.evalFrameAndMessageInstances(sutil, offset)
 
-    def parseBytes(self, showProgress: bool = True, cacheReprs: bool = False):
+    def parseBytes(
+        self,
+        showProgress: bool = True,
+        cacheReprs: bool = False,
+        sharedResults: bool = False,
+    ):
         """
         DEPENDENCY: eval()
         Warning: Consume lots of memory (2GB logfile will consume 30GB memory)
         Parse the whole log file in to representation objects in messages class (Bhuman)
         It need instance classes to be already create by eval()
         It can also cache all the representation objects into pickle files and will be automatically loaded (No need to be parsed next time)
+        With sharedResults, parsed objects stay in shared memory and are only unpickled when accessed, see parseBytesShared()
         """
-        Wrapper = partial(MessageBase.parseBytesWrapper, logFilePath=self.logFilePath)
         cached = []
         parsed = []
         unparsed = []
@@ -250,7 +504,7 @@ class UncompressedChunk(Chunk):
         for message in tqdm(
             self.messages, desc="Checking Message Parsed", disable=not showProgress
         ):
-            if message.isParsed:
+            if message.isParsed or message.absIndex in self.log.pendingReprs:
                 parsed.append(message)
                 continue
             elif message.hasPickledRepr():
@@ -258,7 +512,7 @@ class UncompressedChunk(Chunk):
             else:
                 unparsed.append(message)
 
-        # failed = asyncio.get_event_loop().run_until_complete(self.loadReprs(cached))
+        # failed = self.loadReprs(cached)
         # unparsed.extend(failed)
         # for message in failed:
         #     print(f"Failed to parse message {message.index}")
@@ -267,26 +521,20 @@ class UncompressedChunk(Chunk):
         if len(unparsed) == 0:
             print("All messages are parsed")
             return
-        # for message in unparsed:
-        #     Wrapper((message.startByte + 4, message.endByte, message.classType.read))
-        with Pool(cpu_count()) as p:
-            results = list(
-                tqdm(
-                    p.imap(
-                        Wrapper,
-                        [
-                            (
-                                message.startByte + 4,
-                                message.endByte,
-                                message.classType.read,
-                            )
-                            for message in unparsed
-                        ],
-                    ),
-                    total=len(unparsed),
-                    desc="Parsing All Messages",
-                )
-            )
+        tasks = ParserPool.makeTasks(
+            [message.startByte + 4 for message in unparsed],
+            [message.endByte for message in unparsed],
+            [message.logId for message in unparsed],
+        )
+        if sharedResults and not cacheReprs:
+            self.parseBytesShared(unparsed, tasks)
+            return
+        with ParserPool.fromLog(self.log) as pool:
+            results = []
+            with tqdm(total=len(unparsed), desc="Parsing All Messages") as pbar:
+                for batch in pool.imapBatches(tasks):
+                    results.extend(batch)
+                    pbar.update(len(batch))
         for idx, result in tqdm(
             enumerate(results),
             total=len(results),
@@ -298,101 +546,63 @@ class UncompressedChunk(Chunk):
                 frameTmp: FrameBase = unparsed[idx].frame
                 frameTmp.timer.parseStopwatch(result, frameTmp.index)
         if cacheReprs:
-            asyncio.get_event_loop().run_until_complete(
-                self.dumpReprs(results, unparsed)
-            )
-
-    # background parsing
-    @property
-    @functools.lru_cache(maxsize=1)
-    def parseBytesWrapper(self):
-        return partial(MessageBase.parseBytesWrapper, logFilePath=self.logFilePath)
-
-    def submitJob(self, message: MessageAccessor):
-        """Submit job with bounded queue and backpressure"""
-        if self._shutdown:
-            return
+            self.dumpReprs(results, unparsed)
 
-        # Add queue size monitoring
-        if self._resultQueue.qsize() > self._resultQueue.maxsize * 0.8:
-            time.sleep(0.1)  # Brief pause if queue getting full
+    def parseBytesShared(self, unparsed: List[MessageBase], tasks: np.ndarray):
+        """
+        Parse with ParserPool in shared mode, workers hand every batch over in a shared memory segment
+        Representation objects are registered in log.pendingReprs and unpickled on first access (MessageBase.parseBytes)
+        Stopwatches are loaded right away, the frame timers need them
+        """
+        stopwatchLogId = self.log.MessageIDChunk.mapClassNameToLog.get("Stopwatch")
+        logIds = tasks["logId"]
+        pendingReprs = self.log.pendingReprs
+        idx = 0
+        with ParserPool.fromLog(self.log) as pool:
+            with tqdm(total=len(unparsed), desc="Parsing All Messages") as pbar:
+                for batch in pool.imapBatches(tasks, shared=True):
+                    for batchIndex in range(len(batch)):
+                        message = unparsed[idx]
+                        if logIds[idx] == stopwatchLogId:
+                            result = batch.load(batchIndex)
+                            message.reprObj = result
+                            frameTmp: FrameBase = message.frame
+                            frameTmp.timer.parseStopwatch(result, frameTmp.index)
+                        else:
+                            pendingReprs[message.absIndex] = (batch, batchIndex)
+                        idx += 1
+                    pbar.update(len(batch))
 
-        future = self._executor.submit(
-            self.parseBytesWrapper,
-            (message.startByte + 4, message.endByte, message.classType.read),
+    # background parsing
+    def submitJob(self, message: MessageAccessor) -> Future:
+        """Parse a message in the background ParserPool, its reprObj is cached once the job is done"""
+        pool = self._initExecutor()
+        absIndex = message.absIndex
+        future = pool.submit(
+            ParserPool.makeTasks([message.startByte + 4], [message.endByte], [message.logId])
         )
-
         with self._lock:
             self._activeFutures.add(future)
+        future.add_done_callback(partial(self._futureDoneCallback, absIndex))
+        return future
 
-        future.add_done_callback(self._futureDoneCallback)
-
-    def _futureDoneCallback(self, future):
-        """Callback when future completes"""
-        try:
-            result = future.result()
-            self._resultQueue.put((future, result), timeout=0.1)
-        except queue.Full:
-            # If queue is full, retry with exponential backoff
-            retryCount = 0
-            while retryCount < 3:  # Maximum 3 retries
-                try:
-                    time.sleep(0.1 * (2**retryCount))  # Exponential backoff
-                    self._resultQueue.put((future, result), timeout=0.1)
-                    return
-                except queue.Full:
-                    retryCount += 1
-
-            with self._lock:
-                self._activeFutures.add(future)
-        except Exception as e:
-            print(f"Error processing future: {e}")
-        finally:
-            with self._lock:
-                self._activeFutures.discard(future)
-
-    def _processResults(self):
-        """Process results from queue"""
-        batch = []
-        while not self._shutdown:
-            try:
-                # Reduce timeout from 0.1s to 0.01s
-                future, result = self._resultQueue.get(timeout=0.01)
-                batch.append(result)
-
-                # Process in batches for efficiency but with shorter polling
-                batchStart = time.time()
-                while len(batch) < 100 and (time.time() - batchStart) < 0.05:
-                    try:
-                        future, result = self._resultQueue.get_nowait()
-                        batch.append(result)
-                    except queue.Empty:
-                        break
-
-                if batch:
-                    # Process batch
-                    with self._lock:
-                        for result in batch:
-                            self.log.writeCacheInfo(
-                                "Message", "reprObj", result.messageId, result
-                            )
-                    batch = []
-
-                # Small sleep to prevent tight loop
-                time.sleep(0.001)
-
-            except queue.Empty:
-                # Reduce sleep time on empty queue
-                time.sleep(0.01)
-            except Exception as e:
-                print(f"Error in result processor: {e}")
-                time.sleep(0.1)  # Sleep on error but not too long
+    def _futureDoneCallback(self, absIndex: int, future: Future):
+        with self._lock:
+            self._activeFutures.discard(future)
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.log.messageHandle(absIndex).reprObj = future.result()[0]
 
     def shutdown(self):
-        """Clean shutdown"""
-        self._shutdown = True
-        if self._executor:
-            self._executor.shutdown(wait=True)
+        """Cancel pending background jobs and stop the background ParserPool"""
+        with self._lock:
+            pool = getattr(self, "_parserPool_cached", None)
+            self._parserPool_cached = None
+            futures = list(self._activeFutures)
+        for future in futures:
+            future.cancel()
+        if pool is not None:
+            pool.shutdown(wait=True)
 
     # Index file Validation
     @classmethod
@@ -497,6 +707,7 @@ class UncompressedChunk(Chunk):
                 )
                 # updateTruncatePos(frameIndex[0], lastMessageIndex)
             i += 1
+        log.clearIndexArrays()
         with open(indexFrameFilePath, "r+b") as f:
             f.truncate(frameTruncatePos * FrameAccessor.frameIdxByteLength)
         with open(indexMessageFilePath, "r+b") as f:
@@ -595,67 +806,32 @@ class UncompressedChunk(Chunk):
         return True
 
     # Repr batch IO
-    async def loadReprs(self, unparsed: Messages) -> List[DataClass]:
-        loop = asyncio.get_running_loop()
+    def loadReprs(self, unparsed: Messages) -> List[MessageBase]:
+        """Load representation objects from the log's ReprStore, returns the messages that are not stored"""
         failed = []
-
-        # Create a ThreadPoolExecutor
-        with ThreadPoolExecutor() as executor:
-            # Schedule the synchronous tasks in the executor
-            futures = [
-                loop.run_in_executor(
-                    executor,
-                    MessageBase.loadReprWrapper,
-                    unparsed[idx].reprPicklePath,
-                    idx,
-                )
-                for idx in tqdm(
-                    range(len(unparsed)),
-                    total=len(unparsed),
-                    desc="Queuing All Repr to Load",
-                )
-            ]
-
-            # Show progress bar for loading
-            for future in tqdm(
-                asyncio.as_completed(futures),
-                total=len(futures),
-                desc="Loading All Representations",
-            ):
-                result, index = await future
-                if result is not None:
-                    unparsed[index].reprObj = result
-                failed.append(unparsed[index])
-
+        results = self.log.reprStore.loadMany([message.absIndex for message in unparsed])
+        for message, result in tqdm(
+            zip(unparsed, results),
+            total=len(unparsed),
+            desc="Loading All Representations",
+        ):
+            if result is None:
+                failed.append(message)
+            else:
+                message.reprObj = result
         return failed
 
-    async def dumpReprs(self, results: List[DataClass], unparsed: Messages):
-        loop = asyncio.get_running_loop()
-
-        # Create a ThreadPoolExecutor
-        with ThreadPoolExecutor() as executor:
-            # Schedule the synchronous tasks in the executor
-            futures = [
-                loop.run_in_executor(
-                    executor,
-                    MessageBase.dumpReprWrapper,
-                    unparsed[idx].reprPicklePath,
-                    results[idx],
-                )
-                for idx in tqdm(
-                    range(len(results)),
-                    total=len(results),
-                    desc="Queuing All Repr to Dump",
-                )
-            ]
-
-            # Show progress bar for queuing
-            for future in tqdm(
-                asyncio.as_completed(futures),
-                total=len(futures),
-                desc="Dumping All Representations",
-            ):
-                await future
+    def dumpReprs(self, results: List[DataClass], unparsed: Messages):
+        """Append representation objects to the log's ReprStore in batches"""
+        store = self.log.reprStore
+        for start in tqdm(
+            range(0, len(results), self.reprDumpBatchSize),
+            desc="Dumping All Representations",
+        ):
+            end = start + self.reprDumpBatchSize
+            store.dumpMany(
+                [message.absIndex for message in unparsed[start:end]], results[start:end]
+            )
 
     def numFrames(self):
         return len(self.frames)
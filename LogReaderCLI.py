@@ -1,11 +1,16 @@
 import argparse
 import multiprocessing
+import queue
+import time
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import tqdm
 from pathlib import Path
 
+from ExportPipeline import Pipeline, buildPipeline, exportFormats
 from LogInterface import FrameAccessor, FrameBase, FrameInstance, Frames, Log
+from ImageUtils import imageFormats
 
 VALID_THREADS = ["Upper", "Lower", "Motion", "Audio", "Cognition", "Referee"]
 
@@ -101,62 +106,108 @@ class FrameFilter:
                 raise ValueError("End frame must be greater than start frame")
 
 class LogReaderCLI:
+    """
+    Export frames with several worker processes
+    Frames are grouped into small batches of similar estimated cost (frame bytes, image frames cost extra for
+    decoding and PNG encoding), workers take the next batch from a shared queue as soon as they are done,
+    so a worker that got cheap frames keeps taking work instead of idling while others drag on.
+    """
+
+    batchesPerWorker: int = 16
+    """Number of batches per worker, more batches balance better but cost more queue round trips"""
+    imageFrameCost: int = 4 << 20
+    """Extra cost (in bytes) of a frame with an image, decoding and PNG encoding dominate the frame size"""
+    imageClassNames: List[str] = ["CameraImage", "JPEGImage"]
+    """Message types that make a frame an image frame"""
+
     def __init__(self):
         self.profiler = None
 
-    def _divideListIntoChunks(self, lst, n):
-        if not lst:
+    def _frameSizes(self, LOG: Log, frameIdxes: List[int]) -> np.ndarray:
+        """Size in bytes of the messages of every frame"""
+        frames = LOG.frameIndexArray[np.asarray(frameIdxes, dtype=np.int64)]
+        messageIndexArray = LOG.messageIndexArray
+        msgStart = frames["msgStart"].astype(np.int64)
+        msgEnd = frames["msgEnd"].astype(np.int64)
+        sizes = np.zeros(len(frames), dtype=np.int64)
+        nonEmpty = msgEnd > msgStart
+        sizes[nonEmpty] = messageIndexArray["endByte"][msgEnd[nonEmpty] - 1].astype(
+            np.int64
+        ) - messageIndexArray["startByte"][msgStart[nonEmpty]].astype(np.int64)
+        return sizes
+
+    def _estimateFrameCosts(self, LOG: Log, frameIdxes: List[int], sizes: np.ndarray) -> np.ndarray:
+        """Estimated cost of every frame, its size in bytes (see _frameSizes) plus imageFrameCost if it has an image"""
+        costs = sizes.copy()
+        imageFrames = []
+        for className in self.imageClassNames:
+            try:
+                imageFrames.append(LOG.messageTypeRecords(className)["frameIndex"])
+            except KeyError:  # The log has no message of this type
+                pass
+        if imageFrames:
+            hasImage = np.isin(np.asarray(frameIdxes), np.concatenate(imageFrames))
+            costs[hasImage] += self.imageFrameCost
+        return costs
+
+    def _divideIntoBatches(
+        self, frameIdxes: List[int], costs: np.ndarray, numBatches: int, sizes: np.ndarray
+    ) -> List[Tuple[List[int], int]]:
+        """
+        Consecutive frames grouped into batches of about total cost / numBatches, as (frame indexes, bytes)
+        bytes is the sum of sizes (the real frame sizes, without the image surcharge of costs), for the MB/s report
+        """
+        if not frameIdxes:
             return []
+        targetCost = max(int(costs.sum()) // max(numBatches, 1), 1)
+        # Batch of every frame, cut the cumulative cost into targetCost wide steps
+        batchIds = (np.cumsum(costs) - costs) // targetCost
+        cuts = np.flatnonzero(np.diff(batchIds)) + 1
+        batches = []
+        for start, end in zip(np.r_[0, cuts], np.r_[cuts, len(frameIdxes)]):
+            batches.append(
+                (list(frameIdxes[int(start) : int(end)]), int(sizes[start:end].sum()))
+            )
+        return batches
 
-        chunkSize = len(lst) // n
-        remainder = len(lst) % n
-
-        chunks = []
-        start = 0
-        for i in range(n):
-            end = start + chunkSize + (1 if i < remainder else 0)
-            chunks.append(lst[start:end])
-            start = end
-
-        return chunks
-
-    def _processChunk(self, logFile: str, chunkIndices: list, workerId: int, outputDir: Optional[Path] = None):
-
-        # Initialize Log for this worker
+    def _loadLog(self, logFile: str) -> Log:
         LOG = Log()
         LOG.readLogFile(logFile)
         LOG.eval(isLogFileLarge=True)
+        return LOG
+
+    def _processQueue(
+        self,
+        logFile: str,
+        taskQueue: multiprocessing.Queue,
+        progressQueue: multiprocessing.Queue,
+        workerId: int,
+        outputDir: Optional[Path] = None,
+        log: Optional[Log] = None,
+        pipeline: Optional[Pipeline] = None,
+    ):
+        """
+        Worker loop, push batches from taskQueue through the pipeline until it gets None,
+        report (workerId, frames, bytes) per batch
+        log: the Log evaluated by the parent, inherited through fork, None to evaluate the log in this worker
+        pipeline: the export pipeline, None for the legacy JSON + PNG output
+        """
+        LOG = log if log is not None else self._loadLog(logFile)
 
         if outputDir:
             LOG.outputDir = outputDir
 
-        # Get the frame accessor for this chunk
-        accessor = LOG.getFrameAccessor(chunkIndices)
-
-        # Create positioned progress bar
-        pbar = tqdm.tqdm(
-            total=len(chunkIndices),
-            desc=f"Worker {workerId}",
-            position=workerId,
-            leave=True,
-        )
-
-        # Process frames in our chunk
-        for frame in accessor:
-            frame.saveFrameDict()
-            frame.saveImageWithMetaData(slientFail=True)
-            pbar.update(1)
-
-        pbar.close()
+        if pipeline is None:
+            pipeline = buildPipeline(["legacy"])
+        with pipeline.open(LOG.outputDir, workerId):
+            while (task := taskQueue.get()) is not None:
+                chunkIndices, numBytes = task
+                pipeline.run(LOG.getFrameAccessor(chunkIndices))
+                progressQueue.put((workerId, len(chunkIndices), numBytes))
 
     def _getFilteredIndexMap(
-        self, logFile: str, threads: Optional[List[str]], frameFilter: FrameFilter
+        self, LOG: Log, threads: Optional[List[str]], frameFilter: FrameFilter
     ) -> List[int]:
-        # Create temporary Log to get indices
-        LOG = Log()
-        LOG.readLogFile(logFile)
-        LOG.eval(isLogFileLarge=True)
-
         frameIdxes=[]
         # Get initial frame set based on threads
         if threads:
@@ -175,47 +226,21 @@ class LogReaderCLI:
             frameIdxes = [f for f in frameIdxes if startIdx <= f <= endIdx]
 
         # Apply time range filter if specified
-        frameAcc = LOG.getFrameAccessor(indexMap=frameIdxes)
-        
         if frameFilter.startTime is not None or frameFilter.endTime is not None:
-            startTimestamp = (
-                frameAcc[0].timestamp
+            timestamps = LOG.frameTimestamps[np.asarray(frameIdxes, dtype=np.int64)]
+            startPos = (
+                0
                 if frameFilter.startTime is None
-                else frameFilter.startTime
+                else int(np.searchsorted(timestamps, frameFilter.startTime, "left"))
             )
-            endTimestamp = (
-                frameAcc[-1].timestamp
+            endPos = (
+                len(timestamps)
                 if frameFilter.endTime is None
-                else frameFilter.endTime
+                else int(np.searchsorted(timestamps, frameFilter.endTime, "right"))
             )
 
-            # Binary search
-            left, right = 0, len(frameAcc) - 1
-            startPos, endPos = 0, len(frameAcc) - 1
-
-            # Find start position
-            while left <= right:
-                mid = (left + right) // 2
-                if frameAcc[mid].timestamp < startTimestamp:
-                    startPos = mid + 1
-                    left = mid + 1
-                else:
-                    right = mid - 1
-
-            # Reset
-            left, right = 0, len(frameAcc) - 1
-
-            # Find end position
-            while left <= right:
-                mid = (left + right) // 2
-                if frameAcc[mid].timestamp > endTimestamp:
-                    endPos = mid - 1
-                    right = mid - 1
-                else:
-                    left = mid + 1
-
             # Get filtered frame indices
-            frameIdxes = frameAcc.indexMap[startPos : endPos + 1]
+            frameIdxes = list(frameIdxes[startPos:endPos])
 
         return frameIdxes
 
@@ -242,6 +267,18 @@ Examples:
 
   # Specify custom output directory
   %(prog)s input.log --outdir /path/to/output
+
+  # Export Parquet tables and WebDataset tar shards in one pass
+  %(prog)s input.log --export parquet tar --classes RobotPose BallModel
+
+  # Frames as gzip compressed JSON Lines shards with a random access index (see ExportPipeline.FrameShardReader)
+  %(prog)s input.log --export jsonl.gz
+
+  # Quarter size grayscale thumbnails
+  %(prog)s input.log --export images --image-scale 4 --grayscale
+
+  # Keep the logged JPEGs as they are, with the camera metadata in one JSON Lines file per worker
+  %(prog)s input.log --image-format raw
             """,
         )
 
@@ -281,6 +318,63 @@ Examples:
             help="Custom output directory for processed frames and images",
         )
 
+        parser.add_argument(
+            "--export",
+            choices=list(exportFormats),
+            nargs="+",
+            default=["legacy"],
+            help="Output formats, all written in the same pass (default: legacy, one JSON per frame and PNG images)",
+        )
+
+        parser.add_argument(
+            "--classes",
+            nargs="+",
+            help="Representations to export (default: all), not used by the legacy format",
+        )
+
+        parser.add_argument(
+            "--image-scale",
+            type=int,
+            default=1,
+            help="Keep every n-th pixel of exported images in both directions, JPEGs are scaled while decoding (default: 1)",
+        )
+
+        parser.add_argument(
+            "--grayscale",
+            action="store_true",
+            help="Export only the Y channel of images",
+        )
+
+        parser.add_argument(
+            "--crop",
+            type=int,
+            nargs=4,
+            metavar=("X", "Y", "WIDTH", "HEIGHT"),
+            help="Export only this area of images, in pixels of the full resolution image",
+        )
+
+        parser.add_argument(
+            "--image-format",
+            choices=list(imageFormats),
+            default="png",
+            help="Image files of the legacy format, raw writes the logged JPEG / YUYV bytes without decoding (default: png)",
+        )
+
+        parser.add_argument(
+            "--png-compression",
+            type=int,
+            choices=range(10),
+            metavar="{0-9}",
+            help="zlib level of PNG images, 1 is several times faster than the default 6",
+        )
+
+        parser.add_argument(
+            "--sidecar-metadata",
+            action="store_true",
+            help="Write image metadata to metadata-<worker>.jsonl next to the images instead of PNG text chunks "
+            "(always on for formats other than png)",
+        )
+
         parser.add_argument(
             "--profile", action="store_true", help="Enable performance profiling"
         )
@@ -303,38 +397,101 @@ Examples:
         except ValueError as e:
             parser.error(str(e))
 
+        extractOptions = None
+        if args.image_scale != 1 or args.grayscale or args.crop:
+            if args.image_scale < 1:
+                parser.error("--image-scale must be at least 1")
+            if args.image_format == "raw":
+                parser.error("--image-format raw writes the logged bytes, it can not be combined with "
+                             "--image-scale, --grayscale or --crop")
+            extractOptions = {"scale": args.image_scale, "grayscale": args.grayscale, "crop": args.crop}
+
         if args.outdir:
             args.outdir.mkdir(parents=True, exist_ok=True)
 
+        # Evaluate the log once, forked workers inherit it (index arrays stay mapped, LogClasses are not regenerated)
+        LOG = self._loadLog(args.inputFile)
+        shareLog = multiprocessing.get_start_method() == "fork"
+        if shareLog:
+            LOG.preload()
+
         # Get filtered index map once
-        filteredIndices = self._getFilteredIndexMap(
-            args.inputFile, args.threads, frameFilter
-        )
+        filteredIndices = self._getFilteredIndexMap(LOG, args.threads, frameFilter)
 
         if len(filteredIndices) == 0:
             print("No frames to process")
             return
 
-        chunks = self._divideListIntoChunks(filteredIndices, args.numworkers)
+        writerOptions = {
+            "format": args.image_format,
+            "sidecar": args.sidecar_metadata,
+            "compressLevel": args.png_compression,
+        }
+        pipeline = buildPipeline(
+            args.export, args.classes, extractOptions=extractOptions, writerOptions=writerOptions
+        )
 
-        # Print empty lines to make room for progress bars
-        print("\n" * (args.numworkers - 1))
+        sizes = self._frameSizes(LOG, filteredIndices)
+        costs = self._estimateFrameCosts(LOG, filteredIndices, sizes)
+        batches = self._divideIntoBatches(
+            filteredIndices, costs, args.numworkers * self.batchesPerWorker, sizes
+        )
+        numWorkers = min(args.numworkers, len(batches))
+
+        taskQueue: multiprocessing.Queue = multiprocessing.Queue()
+        progressQueue: multiprocessing.Queue = multiprocessing.Queue()
+        for batch in batches:
+            taskQueue.put(batch)
+        for _ in range(numWorkers):
+            taskQueue.put(None)
 
         # Create and start processes
         processes = []
-        for workerId, chunkIndices in enumerate(chunks):
+        for workerId in range(numWorkers):
             p = multiprocessing.Process(
-                target=self._processChunk,
-                args=(args.inputFile, chunkIndices, workerId, args.outdir),
+                target=self._processQueue,
+                args=(
+                    args.inputFile,
+                    taskQueue,
+                    progressQueue,
+                    workerId,
+                    args.outdir,
+                    LOG if shareLog else None,
+                    pipeline,
+                ),
             )
             processes.append(p)
             p.start()
 
+        # One overall progress bar, fed by the batches the workers report
+        startTime = time.perf_counter()
+        framesPerWorker = [0] * numWorkers
+        bytesDone = 0
+        with tqdm.tqdm(total=len(filteredIndices), desc="Frames", unit="frame") as pbar:
+            for _ in range(len(batches)):
+                while True:
+                    try:
+                        workerId, numFrames, numBytes = progressQueue.get(timeout=1)
+                        break
+                    except queue.Empty:
+                        if not any(p.is_alive() for p in processes):
+                            raise RuntimeError("All workers exited before finishing the frames")
+                framesPerWorker[workerId] += numFrames
+                bytesDone += numBytes  # Log bytes read, not the estimated cost
+                elapsed = time.perf_counter() - startTime
+                pbar.set_postfix(MBps=f"{bytesDone / (1 << 20) / max(elapsed, 1e-9):.1f}")
+                pbar.update(numFrames)
+
         # Wait for all processes to complete
         for p in processes:
             p.join()
 
-        print("\n")
+        elapsed = time.perf_counter() - startTime
+        print(
+            f"{len(filteredIndices)} frames in {elapsed:.1f}s "
+            f"({len(filteredIndices) / max(elapsed, 1e-9):.1f} frames/s, {len(batches)} batches), "
+            f"frames per worker: {framesPerWorker}"
+        )
 
 
 def main():
@@ -34,7 +34,7 @@ def main():
     LOG.eval(isLogFileLarge=True)
 
     # Dump all the representations into json and jpg images
-    for frame in tqdm.tqdm(LOG.UncompressedChunk.thread("Cognition")):
+    for frame in tqdm.tqdm(LOG.UncompressedChunk.thread("Cognition").prefetch()):
         # if frame.hasImage:
         #     frame.saveImageWithMetaData()
         frame.saveFrameDict()
@@ -0,0 +1,175 @@
+import io
+from typing import Any, Optional
+
+import numpy as np
+import tqdm
+
+from Primitive import *
+
+from .StreamUtil import StreamAble, StreamUtil
+
+
+class BufferCursor(StreamUtil):
+    """
+    Fast path StreamUtil, a plain integer cursor over a memoryview of the buffer (usually the log mmap)
+    Positions are absolute in the buffer, so read(sutil, end) of LogClasses works unchanged,
+    primitives are decoded with np.frombuffer at an offset instead of slicing a copy out of the stream,
+    the size is computed once and the progress bar (if any) is only updated every progressChunk bytes
+    Call close() (or use it as a context manager) to release the memoryview, the buffer itself is not closed
+    """
+
+    progressChunk: int = 1 << 24
+    """Bytes the cursor moves between two progress bar updates"""
+
+    def __init__(
+        self,
+        stream: StreamAble,
+        offset: int = 0,
+        showProgress=False,
+        desc="Streaming",
+        sourcePath: Optional[str] = None,
+    ):
+        self._stream = stream  # type: ignore
+        self._view: memoryview = memoryview(stream).cast("B")
+        self._size: int = self._view.nbytes
+        self._pos: int = offset
+        self._reportedPos: int = offset
+        self.sourcePath: Optional[str] = sourcePath
+        self._pbar: Optional[tqdm.tqdm] = None  # type: ignore
+        if showProgress:
+            self._pbar = tqdm.tqdm(
+                total=self._size,
+                initial=offset,
+                unit_scale=True,
+                unit_divisor=1024,
+                position=0,
+                desc=desc,
+            )
+
+    def __enter__(self) -> "BufferCursor":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @property
+    def numReadedBytes(self) -> int:
+        return self._pos
+
+    # Basic Stream Methods
+    def read(self, numBytes) -> bytes:
+        return bytes(self.readView(numBytes))
+
+    def readView(self, numBytes) -> memoryview:
+        """Zero-copy read, the result is only valid as long as the buffer is alive"""
+        start = self._pos
+        end = start + int(numBytes)
+        if end > self._size:
+            raise EOFError("Not enough data to read")
+        self._pos = end
+        if self._pbar is not None:
+            self.updateProgress()
+        return self._view[start:end]
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset, whence=0) -> None:
+        if whence == io.SEEK_SET:
+            self._pos = int(offset)
+        elif whence == io.SEEK_CUR:
+            self._pos += int(offset)
+        elif whence == io.SEEK_END:
+            self._pos = self._size + int(offset)
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if self._pbar is not None:
+            self.updateProgress()
+
+    def size(self) -> int:
+        return self._size
+
+    def getValue(self) -> bytes:
+        return bytes(self._view)
+
+    def remainingSize(self) -> int:
+        return self._size - self._pos
+
+    def atEnd(self) -> bool:
+        return self._pos >= self._size
+
+    def probe(self, numBytes) -> bytes:
+        if self._pos + numBytes > self._size:
+            raise EOFError("Not enough data to read")
+        return bytes(self._view[self._pos : self._pos + numBytes])
+
+    def close(self):
+        if self._pbar is not None:
+            self.updateProgress(force=True)
+            self._pbar.close()
+            self._pbar = None
+        try:
+            self._view.release()
+        except BufferError:  # readView() results still alive, they keep the buffer exported
+            pass
+
+    def updateProgress(self, force=False) -> None:
+        """Only touch tqdm once the cursor moved progressChunk bytes away from the last report"""
+        delta = self._pos - self._reportedPos
+        if force or abs(delta) >= self.progressChunk:
+            self._pbar.update(delta)  # type: ignore
+            self._reportedPos = self._pos
+
+    # Read Primitives (Core function)
+    def readPrimitives(self, typeIndicator: PrimitiveTypeHint, length: int = 1) -> Any:
+        type = Indicator2RealType[typeIndicator]
+
+        if type is Angle:
+            return self.readAngle(length)
+        elif type is Str:
+            return self.readStr(length)
+
+        count = 1 if length == 1 else int(length)
+        if length == -1:
+            count = int(self.readAt(np.dtype(UInt), 1)[0])
+        result = self.readAt(np.dtype(type), count)
+        if length == 1:
+            return result[0]
+        return result.copy()  # Don't let the parsed object pin the buffer
+
+    def readRecord(self, dtype: np.dtype) -> np.void:
+        return self.readAt(dtype, 1).copy()[0]
+
+    def readStr(self, length=1) -> Any:
+        if length == 1:
+            return str(self.readView(self.readPrimitives(UInt)), "ascii")
+        elif length == -1:
+            length = self.readPrimitives(UInt)
+
+        return [
+            str(self.readView(self.readPrimitives(UInt)), "ascii") for _ in range(length)
+        ]
+
+    def readMessageHeader(self) -> tuple[UChar, UInt]:
+        header = int(self.readAt(np.dtype(UInt), 1)[0])
+        return UChar(header & 0xFF), UInt(header >> 8)
+
+    def readLInt(self, length=1) -> Any:
+        return self.readAt(np.dtype(np.int64), length)[0]
+
+    def readAt(self, dtype: np.dtype, count: int) -> np.ndarray:
+        """View count items of dtype at the cursor and move past them"""
+        start = self._pos
+        end = start + dtype.itemsize * count
+        if end > self._size:
+            raise EOFError("Not enough data to read")
+        self._pos = end
+        if self._pbar is not None:
+            self.updateProgress()
+        return np.frombuffer(self._view, dtype, count, start)
+
+    def printTQDM(self):
+        self._pbar = tqdm.tqdm(
+            total=self._size, initial=self._pos, unit_scale=True, unit_divisor=1024
+        )
+        self._reportedPos = self._pos
@@ -1,6 +1,6 @@
 import io
 from mmap import mmap
-from typing import Any, List, Tuple, Union
+from typing import Any, List, Optional, Tuple, Union
 
 import tqdm
 
@@ -30,14 +30,22 @@ AbsoluteByteIndex = int
 class StreamUtil:
     """Suggestion: if you assign a stream to StreamUtil, you should not use it elsewhere"""
 
-    def __init__(self, stream: StreamAble, showProgress=False, desc="Streaming"):
+    def __init__(
+        self,
+        stream: StreamAble,
+        showProgress=False,
+        desc="Streaming",
+        sourcePath: Optional[str] = None,
+    ):
         """
         stream: Can be any type of object that supports read(), seek(), tell(), close(), but it might trigger warnings from StreamAble type check
+        sourcePath: The file the stream maps (positions are offsets in it), lets images keep a lazy handle instead of a copy
         """
         self._stream: Union[mmap, io.BytesIO]
         self._pbar: tqdm.tqdm
 
         self.numReadedBytes: int
+        self.sourcePath: Optional[str] = sourcePath
 
         if isinstance(stream, bytes):
             self._stream = io.BytesIO(stream)
@@ -84,7 +92,8 @@ class StreamUtil:
     def size(self) -> int:
         """Total size of StreamUtil's stream"""
         if isinstance(self.stream, io.BytesIO):
-            return len(self.stream.getvalue())
+            with self.stream.getbuffer() as view:  # getvalue() would copy the whole stream
+                return view.nbytes
         elif isinstance(self.stream, mmap):
             return self.stream.size()
         else:
@@ -156,6 +165,10 @@ class StreamUtil:
             result = result[0]
         return result
 
+    def readRecord(self, dtype: np.dtype) -> np.void:
+        """Read a single record of a NumPy structured dtype, used by the fixed layout readers in LogClasses"""
+        return np.frombuffer(self.read(dtype.itemsize), dtype)[0]
+
     def readAngle(self, length=1) -> Any:
         """Special function for reading Angle Non-Numpy Primitive"""
         if length == 1:
@@ -1,2 +1,3 @@
 from .StreamUtil import (AbsoluteByteIndex, ReadInstruction, StreamAble,
                          StreamUtil, SutilCursor)
+from .BufferCursor import BufferCursor
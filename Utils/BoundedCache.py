@@ -0,0 +1,117 @@
+import sys
+from collections import OrderedDict
+from enum import Enum, auto
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import numpy as np
+
+
+def estimateSize(obj: Any, depth: int = 2) -> int:
+    """
+    Rough memory footprint of obj in bytes
+    NumPy arrays count their data, containers and object attributes are followed depth levels deep,
+    which is enough to tell an image representation (MBs in one array) from a small one
+    """
+    if isinstance(obj, np.ndarray):
+        # getsizeof already includes the data of an array that owns it, a view counts the data it keeps alive
+        return sys.getsizeof(obj) - (obj.nbytes if obj.flags.owndata else 0) + obj.nbytes
+    size = sys.getsizeof(obj)
+    if depth <= 0:
+        return size
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += estimateSize(key, depth - 1) + estimateSize(value, depth - 1)
+    elif isinstance(obj, (list, tuple, set)):
+        for value in obj:
+            size += estimateSize(value, depth - 1)
+    elif hasattr(obj, "__dict__"):
+        size += estimateSize(vars(obj), depth - 1)
+    return size
+
+
+class BoundedCache:
+    """
+    Key value cache bounded by number of entries and/or estimated size in bytes
+    Keeps hit, miss and eviction counters, see stats()
+    """
+
+    class Policy(Enum):
+        LRU = 0
+        """Evict the least recently used entry, get() refreshes an entry"""
+        FIFO = auto()
+        """Evict the oldest inserted entry, get() does not change the order"""
+
+    def __init__(
+        self,
+        maxEntries: Optional[int] = None,
+        maxBytes: Optional[int] = None,
+        policy: "BoundedCache.Policy" = Policy.LRU,
+        sizeOf: Callable[[Any], int] = estimateSize,
+    ):
+        """maxEntries/maxBytes: None means unbounded"""
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        self.policy = policy
+        self.sizeOf = sizeOf
+
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self.numBytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if key not in self._entries:
+            self.misses += 1
+            return default
+        self.hits += 1
+        if self.policy is BoundedCache.Policy.LRU:
+            self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Insert or replace, a replaced entry counts as most recent"""
+        if key in self._entries:
+            self.pop(key)
+        size = self.sizeOf(value)
+        self._entries[key] = value
+        self._sizes[key] = size
+        self.numBytes += size
+        self.evict()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        if key not in self._entries:
+            return default
+        self.numBytes -= self._sizes.pop(key)
+        return self._entries.pop(key)
+
+    def evict(self) -> None:
+        """Drop entries in policy order until the bounds hold again, the newest entry is always kept"""
+        while len(self._entries) > 1 and (
+            (self.maxEntries is not None and len(self._entries) > self.maxEntries)
+            or (self.maxBytes is not None and self.numBytes > self.maxBytes)
+        ):
+            key, _ = self._entries.popitem(last=False)
+            self.numBytes -= self._sizes.pop(key)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._sizes.clear()
+        self.numBytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.numBytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,219 @@
+import json
+from abc import ABCMeta
+from enum import EnumMeta
+from importlib import import_module
+from json.encoder import encode_basestring_ascii
+from typing import IO, Any, List, Optional
+
+import numpy as np
+
+from .JSONEncoder import NoIndent, NumpyEncoder
+
+try:  # Optional dependency, only used by dumpJsonBytes()
+    orjson: Any = import_module("orjson")
+except ImportError:
+    orjson = None
+
+
+class FastJSONEncoder:
+    """
+    Single pass JSON encoder with the same output as SpecialEncoder (dumpJson)
+    ndarrays and NoIndent values are written inline (not indented) right where they are met, instead of
+    being replaced into the finished string afterwards. Output is collected in chunks and, if a file is given,
+    written out every flushChunks chunks, so a large frame is never built as one string.
+    """
+
+    flushChunks: int = 4096
+
+    def __init__(self, indent: Optional[int] = 2):
+        self.indent = indent
+        self.itemSeparator = ", " if indent is None else ","
+        self._chunks: List[str] = []
+        self._file: Optional[IO[str]] = None
+
+    @staticmethod
+    def floatStr(value: float) -> str:
+        if value != value:
+            return "NaN"
+        if value == float("inf"):
+            return "Infinity"
+        if value == -float("inf"):
+            return "-Infinity"
+        return float.__repr__(value)
+
+    @staticmethod
+    def default(obj: Any) -> Any:
+        """Same conversions as SpecialEncoder.default(), ndarray and NoIndent are handled by encodeValue()"""
+        if isinstance(obj, np.integer):
+            return int(obj)
+        elif isinstance(obj, np.floating):
+            return float(obj)
+        elif isinstance(obj, ABCMeta):
+            return f"Class Type: {obj.__name__}"
+        elif isinstance(obj, EnumMeta):
+            return f"Enum Type: {obj.__name__}"
+        else:
+            return str(obj)
+
+    def encode(self, obj: Any) -> str:
+        self._chunks = []
+        self._file = None
+        self.encodeValue(obj, 0)
+        result = "".join(self._chunks)
+        self._chunks = []
+        return result
+
+    def write(self, obj: Any, file: IO[str]) -> None:
+        """Encode obj into a text file"""
+        self._chunks = []
+        self._file = file
+        try:
+            self.encodeValue(obj, 0)
+            self.flush()
+        finally:
+            self._file = None
+
+    def flush(self) -> None:
+        if self._file is not None and self._chunks:
+            self._file.write("".join(self._chunks))
+            self._chunks.clear()  # In place, the encode methods hold a reference to the list
+
+    def encodeKey(self, key: Any) -> str:
+        if isinstance(key, str):
+            return encode_basestring_ascii(key)
+        elif isinstance(key, float):
+            return encode_basestring_ascii(self.floatStr(key))
+        elif key is True:
+            return '"true"'
+        elif key is False:
+            return '"false"'
+        elif key is None:
+            return '"null"'
+        elif isinstance(key, int):
+            return encode_basestring_ascii(int.__repr__(key))
+        raise TypeError(f"keys must be str, int, float, bool or None, not {key.__class__.__name__}")
+
+    def encodeValue(self, obj: Any, level: int) -> None:
+        chunks = self._chunks
+        valueType = type(obj)  # Exact type checks first, they are most of the values
+        if valueType is float:
+            chunks.append(float.__repr__(obj) if obj - obj == 0 else self.floatStr(obj))
+        elif valueType is int:
+            chunks.append(int.__repr__(obj))
+        elif valueType is str:
+            chunks.append(encode_basestring_ascii(obj))
+        elif valueType is dict:
+            self.encodeDict(obj, level)
+        elif valueType is list:
+            self.encodeList(obj, level)
+        elif isinstance(obj, np.floating) and not isinstance(obj, float):
+            chunks.append(self.floatStr(float(obj)))
+        elif isinstance(obj, np.integer):
+            chunks.append(int.__repr__(int(obj)))
+        elif isinstance(obj, str):
+            chunks.append(encode_basestring_ascii(obj))
+        elif obj is None:
+            chunks.append("null")
+        elif obj is True:
+            chunks.append("true")
+        elif obj is False:
+            chunks.append("false")
+        elif isinstance(obj, int):
+            chunks.append(int.__repr__(obj))
+        elif isinstance(obj, float):
+            chunks.append(self.floatStr(obj))
+        elif isinstance(obj, (list, tuple)):
+            self.encodeList(obj, level)
+        elif isinstance(obj, dict):
+            self.encodeDict(obj, level)
+        elif isinstance(obj, np.ndarray):
+            chunks.append(json.dumps(obj.tolist(), cls=NumpyEncoder))
+        elif isinstance(obj, NoIndent):
+            chunks.append(json.dumps(obj.value, cls=NumpyEncoder))
+        else:
+            self.encodeValue(self.default(obj), level)
+
+    def encodeList(self, obj: Any, level: int) -> None:
+        chunks = self._chunks
+        if not obj:
+            chunks.append("[]")
+            return
+        if self.indent is None:
+            separator = self.itemSeparator
+            chunks.append("[")
+        else:
+            newline = "\n" + " " * (self.indent * (level + 1))
+            separator = self.itemSeparator + newline
+            chunks.append("[" + newline)
+        first = True
+        for value in obj:
+            if not first:
+                chunks.append(separator)
+            first = False
+            self.encodeValue(value, level + 1)
+        if self.indent is not None:
+            chunks.append("\n" + " " * (self.indent * level))
+        chunks.append("]")
+        if len(chunks) > self.flushChunks:
+            self.flush()
+
+    def encodeDict(self, obj: dict, level: int) -> None:
+        chunks = self._chunks
+        if not obj:
+            chunks.append("{}")
+            return
+        if self.indent is None:
+            separator = self.itemSeparator
+            chunks.append("{")
+        else:
+            newline = "\n" + " " * (self.indent * (level + 1))
+            separator = self.itemSeparator + newline
+            chunks.append("{" + newline)
+        first = True
+        for key, value in obj.items():
+            if not first:
+                chunks.append(separator)
+            first = False
+            if type(key) is str:
+                chunks.append(encode_basestring_ascii(key) + ": ")
+            else:
+                chunks.append(self.encodeKey(key) + ": ")
+            valueType = type(value)  # Scalars inline, saves a call per value
+            if valueType is float and value - value == 0:
+                chunks.append(float.__repr__(value))
+            elif valueType is int:
+                chunks.append(int.__repr__(value))
+            elif valueType is str:
+                chunks.append(encode_basestring_ascii(value))
+            else:
+                self.encodeValue(value, level + 1)
+        if self.indent is not None:
+            chunks.append("\n" + " " * (self.indent * level))
+        chunks.append("}")
+        if len(chunks) > self.flushChunks:
+            self.flush()
+
+
+def writeJson(obj: Any, file: IO[str], indent: Optional[int] = 2) -> None:
+    """Stream obj into a text file, same content as dumpJson(obj, indent)"""
+    FastJSONEncoder(indent).write(obj, file)
+
+
+def _orjsonDefault(obj: Any) -> Any:
+    if isinstance(obj, NoIndent):
+        return obj.value
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return FastJSONEncoder.default(obj)
+
+
+def dumpJsonBytes(obj: Any) -> bytes:
+    """
+    Compact (single line) UTF-8 JSON, for JSON Lines and other machine read output
+    Uses orjson if it is installed (no spaces after separators, NaN becomes null), FastJSONEncoder otherwise
+    numpy values go through default() either way (not orjson's own numpy support, which writes float32 with
+    float32 precision), so numbers are written the same with and without orjson
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_orjsonDefault, option=orjson.OPT_NON_STR_KEYS)
+    return FastJSONEncoder(None).encode(obj).encode()
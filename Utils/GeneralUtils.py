@@ -3,19 +3,19 @@ Tool functions set. All the function will be exposed in Utils package
 """
 
 import cProfile
-import json
 import mmap
 import os
 import pstats
 import re
 import sys
-from typing import List, Optional, Tuple, Union
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from numpy.typing import NDArray
 
 from Primitive import *
 
-from .JSONEncoder import SpecialEncoder
+from .FastJSON import FastJSONEncoder
 
 
 def findClosestValidValue(list: Union[List, NDArray], index, null_value=-1):
@@ -42,8 +42,52 @@ def findClosestValidValue(list: Union[List, NDArray], index, null_value=-1):
     return presult
 
 
+def flattenStructuredArray(records: NDArray) -> Dict[str, NDArray]:
+    """
+    Split a structured array into 1-D columns
+    Nested fields and array elements get dotted names, e.g. "translation.elems.0"
+    """
+    columns = {}
+
+    def flatten(column: NDArray, key: str):
+        if column.ndim > 1:
+            for i in range(column.shape[1]):
+                flatten(column[:, i], f"{key}.{i}")
+        elif column.dtype.names is not None:
+            for name in column.dtype.names:
+                flatten(column[name], f"{key}.{name}")
+        else:
+            columns[key] = np.ascontiguousarray(column)
+
+    for name in records.dtype.names or ():
+        flatten(records[name], name)
+    return columns
+
+
+def flattenDataClass(obj: Any, prefix: str = "", result: Optional[Dict] = None) -> Dict[str, Any]:
+    """
+    Flatten a representation object to {dotted name: value}, with the same names and values as flattenStructuredArray
+    Enums become their values, Angles their float value
+    """
+    if result is None:
+        result = {}
+    if hasattr(obj, "readOrder"):
+        for attrName in obj.readOrder:
+            flattenDataClass(getattr(obj, attrName), f"{prefix}{attrName}.", result)
+    elif isinstance(obj, (list, tuple, np.ndarray)):
+        for i, value in enumerate(obj):
+            flattenDataClass(value, f"{prefix}{i}.", result)
+    elif isinstance(obj, Enum):
+        result[prefix[:-1]] = obj.value
+    elif isinstance(obj, Angle):
+        result[prefix[:-1]] = obj.value
+    else:
+        result[prefix[:-1]] = obj
+    return result
+
+
 def dumpJson(obj, indent=2) -> str:
-    return json.dumps(obj, indent=indent, cls=SpecialEncoder)
+    return FastJSONEncoder(indent).encode(obj)
 
 
 def bytes2ShortStr(b: bytes):
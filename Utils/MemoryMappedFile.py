@@ -33,7 +33,10 @@ class MemoryMappedFile:
 
     def __del__(self):
         if hasattr(self, "mmap") and self.mmap:
-            self.mmap.close()
+            try:
+                self.mmap.close()
+            except BufferError:  # Views (np.frombuffer, memoryview) still alive, the mmap is freed with them
+                pass
 
     def exists(self) -> bool:
         return self.data is not None
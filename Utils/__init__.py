@@ -1,3 +1,5 @@
+from .BoundedCache import BoundedCache, estimateSize
+from .FastJSON import FastJSONEncoder, dumpJsonBytes, writeJson
 from .GeneralUtils import *
 from .JSONEncoder import NumpyEncoder, SpecialEncoder
 from .MemoryMappedFile import MemoryMappedFile